@@ -1,6 +1,25 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        import api.signals  # noqa: F401
+        from api.cache import is_process_local
+
+        if not is_process_local():
+            return
+        if settings.JWT_ROLE_CLAIMS:
+            raise ImproperlyConfigured(
+                'JWT_ROLE_CLAIMS требует общего для всех процессов кеша: '
+                'отзыв токенов в LocMemCache не виден другим воркерам.'
+            )
+        if settings.ACCESS_TOKEN_CACHE_SIZE:
+            raise ImproperlyConfigured(
+                'ACCESS_TOKEN_CACHE_SIZE требует общего для всех процессов '
+                'кеша: отзыв токенов в LocMemCache не виден другим воркерам.'
+            )
@@ -0,0 +1,251 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.cache import get_cache
+
+User = get_user_model()
+
+ROLE_CLAIM = 'role'
+VERSION_CLAIM = 'ver'
+TOKEN_VERSION_KEY = 'token-version:{}'
+
+
+class RoleTokenUser(TokenUser):
+    """Пользователь, восстановленный из утверждений токена без базы."""
+
+    @cached_property
+    def role(self):
+        return self.token[ROLE_CLAIM]
+
+    @property
+    def is_admin(self):
+        return self.role == User.ADMIN or self.is_superuser
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+
+class AccessTokenCache:
+    """
+    Ограниченный LRU-кеш проверенных токенов доступа в памяти процесса.
+
+    Запись живёт не дольше ACCESS_TOKEN_CACHE_TIMEOUT секунд и не дольше
+    самого токена. Отзыв токенов других процессов замечается сразу по
+    версии токенов, остальные изменения пользователя — по истечении срока.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.entries = OrderedDict()
+            self.user_keys = {}
+            self.hits = 0
+            self.misses = 0
+
+    @staticmethod
+    def get_key(raw_token):
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return hashlib.sha256(raw_token).hexdigest()
+
+    def get(self, raw_token):
+        """
+        Пара (пользователь, токен) или None. Пользователь отдаётся копией:
+        запрос может изменить его и не сохранить.
+        """
+        key = self.get_key(raw_token)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    self.remove(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.copy_user(entry[1]), entry[2]
+
+    @staticmethod
+    def copy_user(user):
+        """Пользователь из утверждений токена не меняется, копия не нужна."""
+        if isinstance(user, TokenUser):
+            return user
+        return copy.copy(user)
+
+    def set(self, raw_token, user, validated_token):
+        maxsize = settings.ACCESS_TOKEN_CACHE_SIZE
+        if not maxsize:
+            return
+        key = self.get_key(raw_token)
+        expires = min(
+            validated_token['exp'],
+            time.time() + settings.ACCESS_TOKEN_CACHE_TIMEOUT,
+        )
+        with self.lock:
+            self.remove(key)
+            self.entries[key] = (
+                expires, self.copy_user(user), validated_token
+            )
+            self.user_keys.setdefault(user.pk, set()).add(key)
+            while len(self.entries) > maxsize:
+                self.remove(next(iter(self.entries)))
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self.user_keys.get(entry[1].pk)
+        keys.discard(key)
+        if not keys:
+            del self.user_keys[entry[1].pk]
+
+    def invalidate_user(self, user_id):
+        with self.lock:
+            for key in self.user_keys.get(user_id, set()).copy():
+                self.remove(key)
+
+    def info(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self.entries),
+                'maxsize': settings.ACCESS_TOKEN_CACHE_SIZE,
+            }
+
+
+token_cache = AccessTokenCache()
+
+
+class RoleClaimsJWTAuthentication(JWTAuthentication):
+    """
+    При JWT_ROLE_CLAIMS токены с ролью не требуют загрузки пользователя:
+    проверяется только закешированная версия его токенов.
+
+    Проверенные токены вместе с пользователем хранятся в token_cache.
+    Версия токенов хранится в кеше каталога, общем для всех процессов.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        cached = token_cache.get(raw_token)
+        if cached is not None and self.is_current(*cached):
+            return cached
+        validated_token = self.get_validated_token(raw_token)
+        user = self.get_user(validated_token)
+        token_cache.set(raw_token, user, validated_token)
+        return user, validated_token
+
+    @staticmethod
+    def is_current(user, validated_token):
+        """
+        Токены могли отозвать в другом процессе: версия сверяется с общим
+        кешем и для токенов из token_cache.
+        """
+        if isinstance(user, RoleTokenUser):
+            version = validated_token.get(VERSION_CLAIM)
+        else:
+            version = user.token_version
+        return get_token_version(user.pk) == version
+
+    def get_user(self, validated_token):
+        if (
+            not settings.JWT_ROLE_CLAIMS
+            or ROLE_CLAIM not in validated_token
+        ):
+            user = super().get_user(validated_token)
+            cache_token_version(user.pk, user.token_version)
+            return user
+        user = RoleTokenUser(validated_token)
+        if get_token_version(user.pk) != validated_token.get(VERSION_CLAIM):
+            raise InvalidToken('Токен отозван.')
+        return user
+
+
+def get_access_token(user):
+    token = RefreshToken.for_user(user).access_token
+    if settings.JWT_ROLE_CLAIMS:
+        token[ROLE_CLAIM] = user.role
+        token[VERSION_CLAIM] = user.token_version
+        token['username'] = user.username
+        if user.is_superuser:
+            token['is_superuser'] = True
+    return token
+
+
+def get_token_version(user_id):
+    version = get_cache().get(TOKEN_VERSION_KEY.format(user_id))
+    if version is None:
+        version = load_token_version(user_id)
+        if version is not None:
+            cache_token_version(user_id, version)
+    return version
+
+
+def load_token_version(user_id):
+    return User.objects.filter(pk=user_id, is_active=True).values_list(
+        'token_version', flat=True
+    ).first()
+
+
+def cache_token_version(user_id, version):
+    """
+    Версия, прочитанная из базы до отзыва, не должна затереть записанную
+    отзывом, поэтому значение только добавляется.
+    """
+    get_cache().add(
+        TOKEN_VERSION_KEY.format(user_id), version,
+        timeout=settings.TOKEN_VERSION_CACHE_TIMEOUT,
+    )
+
+
+def revoke_tokens(user_id):
+    """Отзывает выданные пользователю токены."""
+    User.objects.filter(pk=user_id).update(
+        token_version=F('token_version') + 1
+    )
+    version = load_token_version(user_id)
+    key = TOKEN_VERSION_KEY.format(user_id)
+    if version is None:
+        get_cache().delete(key)
+    else:
+        get_cache().set(
+            key, version, timeout=settings.TOKEN_VERSION_CACHE_TIMEOUT
+        )
+    token_cache.invalidate_user(user_id)
+
+
+def get_user_instance(user):
+    """Модель пользователя для запроса, аутентифицированного по токену."""
+    if isinstance(user, TokenUser):
+        return get_object_or_404(User, pk=user.pk)
+    return user
+
+
+def get_user_reference(user):
+    """Экземпляр модели для внешних ключей без обращения к базе."""
+    if isinstance(user, TokenUser):
+        return User(pk=user.pk, username=user.username)
+    return user
@@ -0,0 +1,239 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left, insort
+
+from django.db.models import Count
+
+from api.cache import get_versions
+from reviews.models import Category, Genre, Title
+
+WORD_RE = re.compile(r'\w+')
+MIN_PREFIX_LENGTH = 2
+TOP_PREFIX_LENGTH = 3
+MAX_LIMIT = 50
+
+
+def normalize(text):
+    return ' '.join(WORD_RE.findall(text.lower().replace('ё', 'е')))
+
+
+class AutocompleteIndex:
+    """
+    Индекс префиксов названий в памяти процесса: отсортированный список
+    ключей вида (суффикс названия с начала слова, модель, pk).
+
+    Изменения в этом процессе применяются по сигналам моделей. Изменения
+    в других процессах замечаются по счётчикам версий каталога и приводят
+    к полной перестройке; пока она идёт, поиск отвечает по старому
+    индексу. Оценки произведений после отзывов в других
+    процессах и число произведений у жанров и категорий обновляются
+    только при перестройке.
+
+    Для коротких префиксов (до TOP_PREFIX_LENGTH символов) хранятся
+    лучшие MAX_LIMIT элементов каждой модели, которые поддерживаются
+    при изменениях, чтобы частый префикс не просматривал все ключи.
+    """
+    models = (Title, Genre, Category)
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.build_lock = threading.Lock()
+        self.versions = None
+        self.keys = []
+        self.items = {}
+        self.top = {}
+
+    @staticmethod
+    def get_title_score(review_count, rating):
+        return review_count, rating or 0
+
+    def build(self):
+        items = {}
+        titles = Title.objects.values_list(
+            'pk', 'name', 'review_count', 'rating'
+        ).order_by()
+        for pk, name, review_count, rating in titles.iterator():
+            items[Title, pk] = (
+                name,
+                {'id': pk, 'name': name},
+                self.get_title_score(review_count, rating),
+            )
+        for model in (Genre, Category):
+            rows = model.objects.annotate(
+                titles_count=Count('titles')
+            ).values_list('pk', 'name', 'slug', 'titles_count').order_by()
+            for pk, name, slug, titles_count in rows.iterator():
+                items[model, pk] = (
+                    name, {'name': name, 'slug': slug}, (titles_count,)
+                )
+        keys = sorted(
+            (key, model._meta.model_name, pk)
+            for (model, pk), (name, _, _) in items.items()
+            for key in self.get_keys(name)
+        )
+        with self.lock:
+            self.items = items
+            self.keys = keys
+            self.top = {}
+
+    @staticmethod
+    def get_keys(name):
+        name = name.lower().replace('ё', 'е')
+        return {normalize(name[match.start():])
+                for match in WORD_RE.finditer(name)}
+
+    def ensure_fresh(self):
+        if get_versions(*self.models) == self.versions:
+            return
+        if not self.build_lock.acquire(blocking=self.versions is None):
+            return
+        try:
+            versions = get_versions(*self.models)
+            if versions != self.versions:
+                self.build()
+                with self.lock:
+                    self.versions = versions
+        finally:
+            self.build_lock.release()
+
+    def accept_version(self, model, previous, version):
+        """
+        Принимает сдвиг счётчика модели после изменения, которое уже
+        применено к индексу (или не касается его). Если индекс не был на
+        прежней версии, изменения других процессов ещё не применены: версия
+        не меняется, и индекс перестроится при следующем поиске.
+        """
+        with self.lock:
+            if self.versions is None:
+                return
+            position = self.models.index(model)
+            if self.versions[position] == previous:
+                self.versions = list(self.versions)
+                self.versions[position] = version
+
+    @staticmethod
+    def get_rank(name, score, pk):
+        """Порядок выдачи: по убыванию оценки, затем по названию."""
+        return tuple(-value for value in score), name.lower(), pk
+
+    def update_top(self, model, pk, old_keys, new_keys, rank):
+        """Поправляет лучшие элементы коротких префиксов без просмотра."""
+        prefixes = {
+            key[:length] for key in old_keys | new_keys
+            for length in range(MIN_PREFIX_LENGTH, TOP_PREFIX_LENGTH + 1)
+        }
+        for prefix in prefixes & self.top.keys():
+            entries = self.top[prefix][model]
+            complete = len(entries) < MAX_LIMIT
+            last = entries[-1][0] if entries else None
+            count = len(entries)
+            entries[:] = [entry for entry in entries if entry[1] != pk]
+            removed = len(entries) < count
+            matches = rank is not None and any(
+                key.startswith(prefix) for key in new_keys
+            )
+            if matches and (complete or rank <= last):
+                insort(entries, (rank, pk))
+                del entries[MAX_LIMIT:]
+            elif removed and not complete:
+                del self.top[prefix]
+
+    def update(self, model, pk, name=None, data=None, score=None):
+        """Заменяет или (при name=None) удаляет элемент индекса."""
+        with self.lock:
+            if self.versions is None:
+                return
+            old = self.items.pop((model, pk), None)
+            old_keys = self.get_keys(old[0]) if old is not None else set()
+            new_keys = self.get_keys(name) if name is not None else set()
+            if old is not None:
+                for key in old_keys:
+                    entry = (key, model._meta.model_name, pk)
+                    index = bisect_left(self.keys, entry)
+                    if index < len(self.keys) and self.keys[index] == entry:
+                        del self.keys[index]
+            if name is not None:
+                if score is None:
+                    score = old[2] if old is not None else (0,)
+                self.items[model, pk] = (name, data, score)
+                for key in new_keys:
+                    insort(self.keys, (key, model._meta.model_name, pk))
+            rank = None if name is None else self.get_rank(name, score, pk)
+            self.update_top(model, pk, old_keys, new_keys, rank)
+
+    def update_instance(self, instance, deleted=False):
+        model = type(instance)
+        if deleted:
+            self.update(model, instance.pk)
+        elif model is Title:
+            self.update(
+                model, instance.pk, instance.name,
+                {'id': instance.pk, 'name': instance.name},
+                self.get_title_score(instance.review_count, instance.rating),
+            )
+        else:
+            self.update(
+                model, instance.pk, instance.name,
+                {'name': instance.name, 'slug': instance.slug},
+            )
+
+    def update_title_score(self, title_id):
+        self.update_title_scores([title_id])
+
+    def update_title_scores(self, title_ids):
+        with self.lock:
+            title_ids = [pk for pk in title_ids if (Title, pk) in self.items]
+            if not title_ids:
+                return
+            scores = Title.objects.filter(pk__in=title_ids).values_list(
+                'pk', 'review_count', 'rating'
+            )
+            for pk, *score in scores:
+                name, data, _ = self.items[Title, pk]
+                score = self.get_title_score(*score)
+                self.items[Title, pk] = (name, data, score)
+                keys = self.get_keys(name)
+                self.update_top(
+                    Title, pk, keys, keys, self.get_rank(name, score, pk)
+                )
+
+    def find_top(self, prefix, limit):
+        """Просмотр всех ключей префикса: лучшие limit элементов моделей."""
+        found = {model: {} for model in self.models}
+        names = {model._meta.model_name: model for model in self.models}
+        index = bisect_left(self.keys, (prefix,))
+        while index < len(self.keys):
+            key, model_name, pk = self.keys[index]
+            if not key.startswith(prefix):
+                break
+            model = names[model_name]
+            name, _, score = self.items[model, pk]
+            found[model][pk] = self.get_rank(name, score, pk)
+            index += 1
+        return {
+            model: heapq.nsmallest(
+                limit, ((rank, pk) for pk, rank in ranks.items())
+            )
+            for model, ranks in found.items()
+        }
+
+    def search(self, query, limit):
+        """Лучшие по оценке совпадения префикса для каждой модели."""
+        prefix = normalize(query)
+        if len(prefix) < MIN_PREFIX_LENGTH:
+            return {model: [] for model in self.models}
+        self.ensure_fresh()
+        with self.lock:
+            top = self.top.get(prefix)
+            if top is None and len(prefix) <= TOP_PREFIX_LENGTH:
+                top = self.top[prefix] = self.find_top(prefix, MAX_LIMIT)
+            elif top is None:
+                top = self.find_top(prefix, limit)
+            return {
+                model: [self.items[model, pk][1] for _, pk in entries[:limit]]
+                for model, entries in top.items()
+            }
+
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,90 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+VERSION_KEY = 'catalog-version:{}'
+RESPONSE_KEY = 'catalog-response:{url}:{versions}'
+FACETS_KEY = 'catalog-facets:{query}:{versions}'
+
+
+def get_cache():
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+
+def is_process_local():
+    """Кеш каталога виден только текущему процессу."""
+    alias = getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')
+    return settings.CACHES[alias]['BACKEND'].endswith('LocMemCache')
+
+
+def get_timeout():
+    return getattr(settings, 'CATALOG_CACHE_TIMEOUT', None)
+
+
+def get_versions(*models):
+    """
+    Возвращает счётчики изменений моделей одним обращением к кешу.
+
+    Отсутствующий счётчик заводится от текущего времени, чтобы после
+    вытеснения из кеша он не совпал со старыми значениями.
+    """
+    cache = get_cache()
+    keys = [VERSION_KEY.format(model._meta.label_lower) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=get_timeout())
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(model):
+    """
+    Счётчик изменений хранит время последнего изменения модели в нс.
+    Возвращает прежнее и новое значения счётчика.
+    """
+    cache = get_cache()
+    key = VERSION_KEY.format(model._meta.label_lower)
+    previous = cache.get(key)
+    version = time.time_ns()
+    cache.set(key, version, timeout=get_timeout())
+    return previous, version
+
+
+def bump_version_on_commit(model, on_bump=None):
+    """
+    Сигналы моделей приходят внутри транзакции записи: параллельный запрос
+    может увидеть новую версию, прочитать ещё старые строки и закешировать
+    их под ней. Поэтому версия сдвигается сразу и ещё раз после фиксации.
+    После каждого сдвига вызывается on_bump(model, previous, version).
+    """
+    def bump():
+        previous, version = bump_version(model)
+        if on_bump is not None:
+            on_bump(model, previous, version)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def get_response_key(request, models):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    url = f'{request.get_host()}{request.path}?{query}'
+    versions = '.'.join(str(version) for version in get_versions(*models))
+    return RESPONSE_KEY.format(
+        url=hashlib.md5(url.encode()).hexdigest(), versions=versions
+    )
+
+
+def get_facets_key(names, params, models):
+    """Ключ фасетов: набор фасетов и значения фильтров, без пагинации."""
+    query = urlencode(sorted(params), doseq=True)
+    query = f'{",".join(sorted(names))}?{query}'
+    versions = '.'.join(str(version) for version in get_versions(*models))
+    return FACETS_KEY.format(
+        query=hashlib.md5(query.encode()).hexdigest(), versions=versions
+    )
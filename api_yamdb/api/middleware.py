@@ -0,0 +1,49 @@
+import json
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from api.metrics import collect_metrics, get_current_metrics
+
+logger = logging.getLogger('api.timing')
+
+
+class RequestTimingMiddleware:
+    """
+    Добавляет к ответу заголовки `Server-Timing` и `X-Query-Count`
+    и пишет в лог строку с метриками запроса.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_TIMING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with collect_metrics() as metrics:
+            response = self.get_response(request)
+        response['X-Query-Count'] = str(metrics.query_count)
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={metrics.db_time * 1000:.2f};'
+            f'desc="{metrics.query_count} queries"',
+            f'serializer;dur={metrics.serializer_time * 1000:.2f}',
+            f'total;dur={metrics.total_time * 1000:.2f}',
+        ))
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **metrics.as_dict(),
+        }))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = get_current_metrics()
+        view_class = getattr(view_func, 'cls', None)
+        if metrics is None or view_class is None:
+            return None
+        metrics.view = view_class.__name__
+        actions = getattr(view_func, 'actions', None) or {}
+        metrics.action = actions.get(request.method.lower())
+        return None
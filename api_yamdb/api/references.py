@@ -0,0 +1,67 @@
+import threading
+
+from django.db import router
+
+from api.cache import get_versions
+from reviews.models import Category, Genre
+
+
+class ReferenceMap:
+    """
+    Справочник slug → запись модели в памяти процесса.
+
+    Перед каждым обращением сверяется счётчик версий модели в общем
+    кеше: его сдвигают сигналы сохранения и удаления в любом процессе,
+    после чего справочник перечитывается одним запросом.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.lock = threading.Lock()
+        self.version = None
+        self.rows = {}
+
+    def __deepcopy__(self, memo):
+        """Поля сериализаторов копируются вместе с аргументами."""
+        return self
+
+    def ensure_fresh(self):
+        version, = get_versions(self.model)
+        with self.lock:
+            if version == self.version:
+                return self.rows
+            self.rows = {
+                slug: (pk, name) for pk, slug, name in
+                self.model.objects.values_list(
+                    'pk', 'slug', 'name'
+                ).order_by().iterator()
+            }
+            self.version = version
+            return self.rows
+
+    def get_ids(self, slugs):
+        """Идентификаторы известных слагов; неизвестные пропускаются."""
+        rows = self.ensure_fresh()
+        return [rows[slug][0] for slug in slugs if slug in rows]
+
+    def get_instances(self, slugs):
+        """
+        Экземпляры модели по слагам без запросов к базе. Возвращает
+        список экземпляров и список неизвестных слагов.
+        """
+        rows = self.ensure_fresh()
+        db = router.db_for_read(self.model)
+        instances, missing = [], []
+        for slug in slugs:
+            if slug in rows:
+                pk, name = rows[slug]
+                instances.append(self.model.from_db(
+                    db, ('id', 'slug', 'name'), (pk, slug, name)
+                ))
+            else:
+                missing.append(slug)
+        return instances, missing
+
+
+genre_map = ReferenceMap(Genre)
+category_map = ReferenceMap(Category)
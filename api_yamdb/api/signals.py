@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.authentication import token_cache
+from api.autocomplete import autocomplete_index
+from api.cache import bump_version_on_commit
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.signals import data_imported, ratings_recalculated
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+def autocomplete_saved(instance, **kwargs):
+    autocomplete_index.update_instance(instance)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def autocomplete_deleted(instance, **kwargs):
+    autocomplete_index.update_instance(instance, deleted=True)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def catalog_changed(sender, **kwargs):
+    """
+    Изменения произведений, жанров и категорий к этому моменту уже
+    применены к индексу автодополнения, и он принимает их версии.
+    """
+    if sender in autocomplete_index.models:
+        bump_version_on_commit(sender, autocomplete_index.accept_version)
+    else:
+        bump_version_on_commit(sender)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(instance, **kwargs):
+    token_cache.invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def autocomplete_review_changed(instance, **kwargs):
+    if not getattr(instance, 'deleted_by_cascade', False):
+        autocomplete_index.update_title_score(instance.title_id)
+
+
+@receiver(ratings_recalculated)
+def autocomplete_ratings_recalculated(title_ids, **kwargs):
+    autocomplete_index.update_title_scores(title_ids)
+
+
+@receiver(data_imported)
+def catalog_imported(sender, **kwargs):
+    bump_version_on_commit(
+        Title if sender is Title.genre.through else sender
+    )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_version_on_commit(Title, autocomplete_index.accept_version)
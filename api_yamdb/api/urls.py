@@ -2,6 +2,7 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from api.v1.views import (
+    AutocompleteView,
     CategoryViewSet,
     CommentViewSet,
     GenreViewSet,
@@ -32,6 +33,7 @@ auth_urls = [
 ]
 
 urlpatterns = [
+    path('v1/autocomplete/', AutocompleteView.as_view()),
     path('v1/', include(router.urls)),
     path('v1/auth/', include(auth_urls)),
 ]
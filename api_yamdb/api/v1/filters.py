@@ -1,12 +1,128 @@
-from django_filters import CharFilter, FilterSet
+from django.db.models import Count, F
+from django_filters import (BaseInFilter, CharFilter, ChoiceFilter,
+                            FilterSet, NumberFilter, OrderingFilter)
+from django_filters.constants import EMPTY_VALUES
 
+from api.references import category_map, genre_map
 from reviews.models import Title
+from reviews.search import search_titles
+
+TITLE_FACETS = ('genre', 'category', 'decade')
+
+
+class SlugInFilter(BaseInFilter, CharFilter):
+    """Список слагов через запятую."""
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """
+    Сортировка с добавлением pk для однозначного порядка страниц;
+    произведения без рейтинга всегда идут в конце.
+    """
+    nulls_last = ('rating',)
+
+    def get_ordering_value(self, param):
+        descending = param.startswith('-')
+        field_name = self.param_map[param.lstrip('-')]
+        if field_name not in self.nulls_last:
+            return super().get_ordering_value(param)
+        field = F(field_name)
+        if descending:
+            return field.desc(nulls_last=True)
+        return field.asc(nulls_last=True)
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        ordering = [self.get_ordering_value(param) for param in value]
+        ordering.append('-pk' if value[-1].startswith('-') else 'pk')
+        return qs.order_by(*ordering)
 
 
 class TitleFilter(FilterSet):
-    genre = CharFilter(field_name='genre__slug')
-    category = CharFilter(field_name='category__slug')
+    genre = SlugInFilter(method='filter_genre')
+    genre_match = ChoiceFilter(
+        choices=(('any', 'любой из жанров'), ('all', 'все жанры')),
+        method='filter_genre_match',
+    )
+    category = SlugInFilter(method='filter_category')
+    year_min = NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = NumberFilter(field_name='rating', lookup_expr='lte')
+    search = CharFilter(method='filter_search')
+    ordering = TitleOrderingFilter(
+        fields=('rating', 'year', 'review_count')
+    )
 
     class Meta:
         model = Title
         fields = ('genre', 'category', 'year', 'name')
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Произведения хотя бы с одним из жанров или, при genre_match=all,
+        со всеми жанрами списка. Подзапрос к промежуточной таблице не
+        размножает строки, в отличие от соединения; слаги заменяются на
+        идентификаторы по справочнику, без соединения с жанрами.
+        """
+        slugs = set(value)
+        genre_ids = genre_map.get_ids(slugs)
+        links = Title.genre.through.objects.filter(genre_id__in=genre_ids)
+        if self.form.cleaned_data.get('genre_match') == 'all':
+            if len(genre_ids) < len(slugs):
+                return queryset.none()
+            links = links.values('title_id').annotate(
+                matched=Count('genre_id')
+            ).filter(matched=len(slugs))
+        return queryset.filter(pk__in=links.values('title_id'))
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(
+            category_id__in=category_map.get_ids(set(value))
+        )
+
+    def filter_genre_match(self, queryset, name, value):
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+
+def get_title_facets(queryset, names):
+    """
+    Число произведений выборки по жанрам, категориям и десятилетиям:
+    по одному сгруппированному запросу на фасет.
+    """
+    title_ids = queryset.values('pk')
+    titles = Title.objects.filter(pk__in=title_ids)
+    facets = {}
+    if 'genre' in names:
+        rows = Title.genre.through.objects.filter(
+            title__in=title_ids
+        ).values('genre__slug', 'genre__name').annotate(
+            count=Count('title')
+        ).order_by('-count', 'genre__slug')
+        facets['genre'] = [
+            {'slug': slug, 'name': name, 'count': count}
+            for slug, name, count in rows.values_list(
+                'genre__slug', 'genre__name', 'count'
+            )
+        ]
+    if 'category' in names:
+        rows = titles.filter(category__isnull=False).values(
+            'category__slug', 'category__name'
+        ).annotate(count=Count('pk')).order_by('-count', 'category__slug')
+        facets['category'] = [
+            {'slug': slug, 'name': name, 'count': count}
+            for slug, name, count in rows.values_list(
+                'category__slug', 'category__name', 'count'
+            )
+        ]
+    if 'decade' in names:
+        facets['decade'] = list(
+            titles.values(decade=F('year') / 10 * 10).annotate(
+                count=Count('pk')
+            ).order_by('decade')
+        )
+    return facets
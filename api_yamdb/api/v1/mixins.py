@@ -1,4 +1,15 @@
-from rest_framework import mixins, viewsets
+import hashlib
+import time
+
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import mixins, status, viewsets
+from rest_framework.response import Response
+
+from api.cache import (get_cache, get_response_key, get_timeout,
+                       get_versions)
+from api.metrics import measure_serializer
 
 
 class ListCreateDestroyViewSet(
@@ -9,3 +20,112 @@ class ListCreateDestroyViewSet(
 ):
     """Вьюсет для перечисления, создания, удаления"""
     pass
+
+
+class TimedSerializerMixin:
+    """Учитывает время сериализации в метриках запроса"""
+
+    def to_representation(self, instance):
+        with measure_serializer():
+            return super().to_representation(instance)
+
+
+class CatalogCacheMixin:
+    """Кеширует список для анонимных пользователей до изменения моделей"""
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        cache = get_cache()
+        key = get_response_key(request, self.cache_models)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(
+                key, response.data,
+                timeout=get_timeout(),
+            )
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Отвечает 304 по `If-None-Match`/`If-Modified-Since`, не вызывая
+    сериализатор. ETag и Last-Modified строятся по счётчикам изменений
+    моделей из `condition_models`.
+
+    Last-Modified округляется вверх до секунды и отдаётся только после
+    того, как эта секунда прошла: иначе изменение в ту же секунду не
+    сдвинуло бы его, и `If-Modified-Since` дал бы устаревший 304.
+    """
+    condition_models = ()
+
+    def get_condition(self, request):
+        versions = get_versions(*self.condition_models)
+        key = (
+            f'{request.get_full_path()}:{request.accepted_renderer.format}:'
+            f'{".".join(str(version) for version in versions)}'
+        )
+        etag = quote_etag(hashlib.md5(key.encode()).hexdigest())
+        last_modified = -(-max(versions) // 10 ** 9)
+        if last_modified > time.time():
+            last_modified = None
+        return etag, last_modified
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_condition(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if status.is_success(response.status_code) or (
+            response.status_code == status.HTTP_304_NOT_MODIFIED
+        ):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class NestedListMixin:
+    """
+    Вложенный список без отдельного запроса родительского объекта: путь
+    проверяется условием в том же запросе, а существование родителя
+    отдельно проверяется только для пустой страницы.
+    """
+    parent_model = None
+    parent_field = None
+    parent_lookups = {}
+
+    def get_parent_filter(self, prefix=''):
+        return {
+            f'{prefix}{lookup}': self.kwargs.get(kwarg)
+            for lookup, kwarg in self.parent_lookups.items()
+        }
+
+    def get_queryset(self):
+        return super().get_queryset().filter(
+            **self.get_parent_filter(f'{self.parent_field}__')
+        )
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page and not self.parent_model.objects.filter(
+            **self.get_parent_filter()
+        ).exists():
+            raise Http404
+        return page
@@ -0,0 +1,66 @@
+from rest_framework import pagination
+from rest_framework.exceptions import ValidationError
+
+
+class CursorPagination(pagination.CursorPagination):
+    """
+    Курсор строится по постоянному порядку представления, поэтому
+    параметры с собственным порядком (сортировка, ранжирование поиска)
+    в курсорном режиме отклоняются, а не теряются молча.
+    """
+    ordering = ('-pk',)
+    ordering_query_params = ('ordering', 'search')
+
+    def get_ordering(self, request, queryset, view):
+        conflicts = [
+            param for param in self.ordering_query_params
+            if request.query_params.get(param, '').strip()
+        ]
+        if conflicts:
+            raise ValidationError({
+                param: [
+                    'Параметр несовместим с курсорной пагинацией, '
+                    'используйте постраничную.'
+                ]
+                for param in conflicts
+            })
+        return getattr(view, 'cursor_ordering', self.ordering)
+
+
+class PageNumberOrCursorPagination(pagination.PageNumberPagination):
+    """
+    Постраничная пагинация с возможностью перейти на курсорную.
+
+    Курсорный режим включается параметром `?pagination=cursor` или
+    наличием `cursor` в запросе и не выполняет ни COUNT, ни OFFSET.
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    cursor_paginator_class = CursorPagination
+
+    def use_cursor(self, request):
+        cursor_query_param = self.cursor_paginator_class.cursor_query_param
+        return (
+            request.query_params.get(self.mode_query_param)
+            == self.cursor_mode
+            or cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_paginator_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_html_context()
+        return super().get_html_context()
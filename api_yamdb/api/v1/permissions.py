@@ -33,7 +33,7 @@ class AuthorAdminModeratorPermission(permissions.BasePermission):
             request.method in permissions.SAFE_METHODS
             or request.user.is_authenticated
             and (
-                obj.author == request.user
+                obj.author_id == request.user.pk
                 or request.user.is_admin
                 or request.user.is_moderator
             )
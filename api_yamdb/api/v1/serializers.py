@@ -1,24 +1,73 @@
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.utils.encoding import smart_str
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+from rest_framework.settings import api_settings
 
+from api.autocomplete import MAX_LIMIT, MIN_PREFIX_LENGTH, normalize
+from api.references import category_map, genre_map
+from api.v1.mixins import TimedSerializerMixin
 from reviews.models import Category, Comment, Genre, Review, Title
 
 User = get_user_model()
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class ReferenceSlugListField(serializers.ManyRelatedField):
+    """Список слагов, разрешаемый по справочнику целиком."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        return self.child_relation.get_instances(data)
+
+
+class ReferenceSlugField(serializers.SlugRelatedField):
+    """Слаг жанра или категории, разрешаемый по справочнику в памяти."""
+
+    def __init__(self, reference, **kwargs):
+        self.reference = reference
+        kwargs.setdefault('queryset', reference.model.objects.all())
+        super().__init__(slug_field='slug', **kwargs)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return ReferenceSlugListField(**list_kwargs)
+
+    def get_instances(self, data):
+        if not all(isinstance(slug, str) for slug in data):
+            self.fail('invalid')
+        instances, missing = self.reference.get_instances(data)
+        if missing:
+            self.fail(
+                'does_not_exist', slug_name=self.slug_field,
+                value=smart_str(missing[0]),
+            )
+        return instances
+
+    def to_internal_value(self, data):
+        return self.get_instances([data])[0]
+
+
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ('name', 'slug')
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Genre
         fields = ('name', 'slug')
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(many=True, read_only=True)
     rating = serializers.IntegerField(read_only=True)
@@ -36,13 +85,9 @@ class TitleReadSerializer(serializers.ModelSerializer):
         model = Title
 
 
-class TitleCreateSerializer(serializers.ModelSerializer):
-    category = serializers.SlugRelatedField(
-        slug_field='slug', queryset=Category.objects.all()
-    )
-    genre = serializers.SlugRelatedField(
-        slug_field='slug', many=True, queryset=Genre.objects.all()
-    )
+class TitleCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    category = ReferenceSlugField(category_map)
+    genre = ReferenceSlugField(genre_map, many=True)
 
     class Meta:
         fields = ('name', 'year', 'description', 'category', 'genre')
@@ -53,7 +98,7 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         return serializer.data
 
 
-class UserBaseSerializer(serializers.Serializer):
+class UserBaseSerializer(TimedSerializerMixin, serializers.Serializer):
     username = serializers.RegexField(
         regex=r'^[\w.@+-]+$',
         max_length=150,
@@ -90,7 +135,22 @@ class UserTokenSerializer(UserBaseSerializer):
     confirmation_code = serializers.CharField(max_length=25)
 
 
-class UserSerializer(serializers.ModelSerializer):
+class AutocompleteSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=100)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=MAX_LIMIT, default=10
+    )
+
+    def validate_q(self, value):
+        if len(normalize(value)) < MIN_PREFIX_LENGTH:
+            raise serializers.ValidationError(
+                f'Запрос должен содержать не меньше {MIN_PREFIX_LENGTH} '
+                'букв или цифр.'
+            )
+        return value
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = (
@@ -103,7 +163,7 @@ class UserSerializer(serializers.ModelSerializer):
         )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username',
         default=serializers.CurrentUserDefault(),
@@ -115,19 +175,24 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only_fields = ('title',)
         model = Review
 
-    def validate(self, attrs):
-        if self.context.get('request').method != 'POST':
-            return attrs
-        user = self.context.get('request').user
-        title_id = self.context.get('view').kwargs.get('title_id')
-        if Review.objects.filter(author=user, title__pk=title_id).exists():
-            raise serializers.ValidationError(
-                'Можно оставить только один отзыв!',
-            )
-        return attrs
-
-
-class CommentSerializer(serializers.ModelSerializer):
+    def create(self, validated_data):
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            duplicate = Review.objects.filter(
+                title_id=validated_data['title_id'],
+                author=validated_data['author'],
+            ).exists()
+            if not duplicate:
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Можно оставить только один отзыв!',
+                ],
+            })
+
+
+class CommentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username',
         default=serializers.CurrentUserDefault(),
@@ -1,12 +1,30 @@
 from django.conf import settings
 from django.core.mail import send_mail
 
+from users.models import OutboxEmail
+
 
 def send_confirmation_code(code, mail):
+    """
+    При EMAIL_OUTBOX письмо ставится в очередь, которую отправляет команда
+    sendoutbox, иначе отправляется сразу.
+    """
+    subject = 'YaMDb confirmation code'
+    message = (
+        'Здравствуйте!\n\nВаш код подтверждения для входа на сайт '
+        f'YaMDb: {code}\n\nС наилучшими пожеланиями,\nКоманда YaMDb.'
+    )
+    if settings.EMAIL_OUTBOX:
+        OutboxEmail.objects.create(
+            subject=subject,
+            body=message,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient=mail,
+        )
+        return
     send_mail(
-        subject='YaMDb confirmation code',
-        message='Здравствуйте!\n\nВаш код подтверждения для входа на сайт '
-        f'YaMDb: {code}\n\nС наилучшими пожеланиями,\nКоманда YaMDb.',
+        subject=subject,
+        message=message,
         from_email=settings.DEFAULT_FROM_EMAIL,
         recipient_list=[mail],
         fail_silently=False,
@@ -1,23 +1,38 @@
 from django.contrib.auth import get_user_model
-from django.contrib.auth.hashers import check_password
-from django.db.models import Avg
+from django.db import transaction
+from django.http import Http404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 
-from api.v1.filters import TitleFilter
-from api.v1.mixins import ListCreateDestroyViewSet
+from api.authentication import (
+    get_access_token,
+    get_user_instance,
+    get_user_reference,
+    revoke_tokens,
+)
+from api.autocomplete import autocomplete_index
+from api.cache import get_cache, get_facets_key, get_timeout
+from api.v1.filters import TITLE_FACETS, TitleFilter, get_title_facets
+from api.v1.mixins import (
+    CatalogCacheMixin,
+    ConditionalGetMixin,
+    ListCreateDestroyViewSet,
+    NestedListMixin,
+)
+from api.v1.pagination import PageNumberOrCursorPagination
 from api.v1.permissions import (
     AdminOnlyPermission,
     AdminOrReadOnlyPermission,
     AuthorAdminModeratorPermission,
 )
 from api.v1.serializers import (
+    AutocompleteSerializer,
     CategorySerializer,
     CommentSerializer,
     GenreSerializer,
@@ -29,41 +44,89 @@ from api.v1.serializers import (
     UserTokenSerializer,
 )
 from api.v1.utils import send_confirmation_code
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import ConfirmationCode
 
 User = get_user_model()
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ConditionalGetMixin, CatalogCacheMixin, viewsets.ModelViewSet
+):
     permission_classes = (AdminOrReadOnlyPermission,)
-    queryset = Title.objects.all().annotate(
-        rating=Avg('reviews__score')).order_by('pk')
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre'
+    ).order_by('pk')
     serializer_class = TitleReadSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('pk',)
+    cache_models = (Title, Genre, Category, Review)
+    condition_models = cache_models
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return TitleReadSerializer
         return TitleCreateSerializer
 
+    def list(self, request, *args, **kwargs):
+        facets = self.get_facet_names()
+        response = super().list(request, *args, **kwargs)
+        if facets and response.status_code == status.HTTP_200_OK:
+            response.data['facets'] = self.get_facets(facets)
+        return response
 
-class CategoryViewSet(ListCreateDestroyViewSet):
+    def get_facet_names(self):
+        value = self.request.query_params.get('facets')
+        if value is None:
+            return ()
+        names = [name for name in value.split(',') if name] or TITLE_FACETS
+        unknown = set(names) - set(TITLE_FACETS)
+        if unknown:
+            raise ValidationError({
+                'facets': [
+                    f'Неизвестные фасеты: {", ".join(sorted(unknown))}. '
+                    f'Доступны: {", ".join(TITLE_FACETS)}.'
+                ],
+            })
+        return names
+
+    def get_facets(self, names):
+        params = [
+            (name, self.request.query_params.getlist(name))
+            for name in self.filterset_class.base_filters
+            if name in self.request.query_params
+        ]
+        cache = get_cache()
+        key = get_facets_key(names, params, self.cache_models)
+        facets = cache.get(key)
+        if facets is None:
+            facets = get_title_facets(
+                self.filter_queryset(self.get_queryset()), names
+            )
+            cache.set(key, facets, timeout=get_timeout())
+        return facets
+
+
+class CategoryViewSet(CatalogCacheMixin, ListCreateDestroyViewSet):
     permission_classes = (AdminOrReadOnlyPermission,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_models = (Category,)
 
 
-class GenreViewSet(ListCreateDestroyViewSet):
+class GenreViewSet(CatalogCacheMixin, ListCreateDestroyViewSet):
     permission_classes = (AdminOrReadOnlyPermission,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_models = (Genre,)
 
 
 class UserTokenView(APIView):
@@ -76,9 +139,8 @@ class UserTokenView(APIView):
             User,
             username=serializer.validated_data['username'],
         )
-        if not check_password(
-            serializer.validated_data['confirmation_code'],
-            user.password,
+        if not ConfirmationCode.redeem(
+            user, serializer.validated_data['confirmation_code']
         ):
             return Response(
                 {
@@ -88,7 +150,7 @@ class UserTokenView(APIView):
             )
         return Response(
             {
-                'access': str(RefreshToken.for_user(user).access_token),
+                'access': str(get_access_token(user)),
             },
         )
 
@@ -103,19 +165,33 @@ class UserCreateView(APIView):
             username=serializer.validated_data['username'],
             email=serializer.validated_data['email'],
         ).first()
-        code = User.objects.make_random_password()
-        if not user:
-            User.objects.create_user(
-                **serializer.validated_data,
-                password=code,
-            )
-        else:
-            user.set_password(code)
-            user.save()
-        send_confirmation_code(code, serializer.validated_data['email'])
+        with transaction.atomic():
+            if not user:
+                user = User.objects.create_user(**serializer.validated_data)
+            code = ConfirmationCode.issue(user)
+            send_confirmation_code(code, serializer.validated_data['email'])
         return Response(serializer.data)
 
 
+class AutocompleteView(APIView):
+    permission_classes = (AllowAny,)
+
+    def get(self, request):
+        serializer = AutocompleteSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        found = autocomplete_index.search(
+            serializer.validated_data['q'],
+            serializer.validated_data['limit'],
+        )
+        return Response(
+            {
+                'titles': found[Title],
+                'genres': found[Genre],
+                'categories': found[Category],
+            },
+        )
+
+
 class UsersViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -132,14 +208,15 @@ class UsersViewSet(viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated]
     )
     def users_me(self, request):
+        user = get_user_instance(request.user)
         if request.method == 'GET':
-            serializer = UserSerializer(request.user)
+            serializer = UserSerializer(user)
             return Response(serializer.data)
         data = request.data.copy()
         if 'role' in data:
             data.pop('role')
         serializer = UserSerializer(
-            request.user,
+            user,
             data=data,
             partial=True
         )
@@ -150,36 +227,61 @@ class UsersViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(password=User.objects.make_random_password())
 
+    def perform_update(self, serializer):
+        role = serializer.instance.role
+        user = serializer.save()
+        if user.role != role:
+            revoke_tokens(user.pk)
+
+    def perform_destroy(self, instance):
+        user_id = instance.pk
+        instance.delete()
+        revoke_tokens(user_id)
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ConditionalGetMixin, NestedListMixin, viewsets.ModelViewSet
+):
+    queryset = Review.objects.select_related('author')
     serializer_class = ReviewSerializer
     permission_classes = (AuthorAdminModeratorPermission,)
     http_method_names = ('get', 'post', 'patch', 'delete')
-
-    def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        return title.reviews.all()
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('-pub_date', '-pk')
+    condition_models = (Title, Review, User)
+    parent_model = Title
+    parent_field = 'title'
+    parent_lookups = {'pk': 'title_id'}
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(title=title, author=self.request.user)
+        try:
+            serializer.save(
+                title_id=self.kwargs.get('title_id'),
+                author=get_user_reference(self.request.user),
+            )
+        except Title.DoesNotExist:
+            raise Http404
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ConditionalGetMixin, NestedListMixin, viewsets.ModelViewSet
+):
+    queryset = Comment.objects.select_related('author')
     serializer_class = CommentSerializer
     permission_classes = (AuthorAdminModeratorPermission,)
     http_method_names = ('get', 'post', 'patch', 'delete')
-
-    def get_queryset(self):
-        review = get_object_or_404(
-            Review, id=self.kwargs.get('review_id'),
-            title__id=self.kwargs.get('title_id')
-        )
-        return review.comments.all()
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('-pub_date', '-pk')
+    condition_models = (Title, Review, Comment, User)
+    parent_model = Review
+    parent_field = 'review'
+    parent_lookups = {'pk': 'review_id', 'title_id': 'title_id'}
 
     def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review, id=self.kwargs.get('review_id'),
-            title__id=self.kwargs.get('title_id')
-        )
-        serializer.save(review=review, author=self.request.user)
+        with transaction.atomic():
+            if not Review.objects.filter(**self.get_parent_filter()).exists():
+                raise Http404
+            serializer.save(
+                review_id=self.kwargs.get('review_id'),
+                author=get_user_reference(self.request.user),
+            )
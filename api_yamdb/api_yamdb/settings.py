@@ -26,6 +26,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -35,6 +36,8 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+REQUEST_TIMING = os.getenv('REQUEST_TIMING', default='False') == 'True'
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
@@ -67,6 +70,25 @@ DATABASES = {
     }
 }
 
+CACHE_BACKEND = os.getenv(
+    'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+)
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+CATALOG_CACHE_ALIAS = 'default'
+
+# LocMemCache не виден другим процессам: сдвиг версий в одном воркере
+# остальные не заметят, поэтому без общего кеша записи живут недолго.
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', 0)) or (
+    60 if CACHE_BACKEND.endswith('LocMemCache') else None
+)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -109,12 +131,24 @@ DOMAIN = 'yamdb.com'
 
 DEFAULT_FROM_EMAIL = f'noreply@{DOMAIN}'
 
+EMAIL_OUTBOX = os.getenv('EMAIL_OUTBOX', default='True') == 'True'
+
+EMAIL_OUTBOX_RETRY_DELAY = timedelta(seconds=30)
+
+EMAIL_OUTBOX_MAX_RETRY_DELAY = timedelta(hours=1)
+
+CONFIRMATION_CODE_LENGTH = 10
+
+CONFIRMATION_CODE_TTL = timedelta(
+    seconds=int(os.getenv('CONFIRMATION_CODE_TTL', default=60 * 60))
+)
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.RoleClaimsJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
@@ -125,3 +159,27 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+JWT_ROLE_CLAIMS = os.getenv('JWT_ROLE_CLAIMS', default='False') == 'True'
+
+TOKEN_VERSION_CACHE_TIMEOUT = 5 * 60
+
+ACCESS_TOKEN_CACHE_SIZE = int(os.getenv('ACCESS_TOKEN_CACHE_SIZE', default=0))
+
+ACCESS_TOKEN_CACHE_TIMEOUT = 60
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,150 @@
+import csv
+import gzip
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Экспорт данных в csv файлы в формате importdata.'
+    CHUNK_SIZE = 2000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', type=Path, help='Каталог для csv файлов.',
+        )
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help=(
+                'Сжимать файлы (имена вида users.csv.gz), importdata '
+                'читает их без распаковки.'
+            ),
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=self.CHUNK_SIZE,
+            help='Размер пачки строк, читаемых из базы за раз.',
+        )
+        parser.add_argument(
+            '--with-passwords', action='store_true',
+            help=(
+                'Добавить в users.csv хеши паролей для загрузки через '
+                'importdata --bulk --passwords prehashed.'
+            ),
+        )
+
+    @staticmethod
+    def get_export_columns(with_passwords=False):
+        """Колонки csv файлов в виде пар (заголовок, поле модели)."""
+        user_columns = (
+            ('id', 'id'),
+            ('username', 'username'),
+            ('email', 'email'),
+            ('role', 'role'),
+            ('bio', 'bio'),
+            ('first_name', 'first_name'),
+            ('last_name', 'last_name'),
+        )
+        if with_passwords:
+            user_columns += (('password', 'password'),)
+        name_slug_columns = (('id', 'id'), ('name', 'name'), ('slug', 'slug'))
+        return (
+            ('users.csv', User, user_columns),
+            ('category.csv', Category, name_slug_columns),
+            ('genre.csv', Genre, name_slug_columns),
+            ('titles.csv', Title, (
+                ('id', 'id'),
+                ('name', 'name'),
+                ('year', 'year'),
+                ('category', 'category_id'),
+                ('description', 'description'),
+            )),
+            ('genre_title.csv', Title.genre.through, (
+                ('id', 'id'),
+                ('title_id', 'title_id'),
+                ('genre_id', 'genre_id'),
+            )),
+            ('review.csv', Review, (
+                ('id', 'id'),
+                ('title_id', 'title_id'),
+                ('text', 'text'),
+                ('author', 'author_id'),
+                ('score', 'score'),
+                ('pub_date', 'pub_date'),
+            )),
+            ('comments.csv', Comment, (
+                ('id', 'id'),
+                ('review_id', 'review_id'),
+                ('text', 'text'),
+                ('author', 'author_id'),
+                ('pub_date', 'pub_date'),
+            )),
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        path.mkdir(parents=True, exist_ok=True)
+        with transaction.atomic():
+            self.start_snapshot()
+            self.export_files(path, options)
+        self.stdout.write(self.style.SUCCESS('Записи успешно экспортированы.'))
+
+    @staticmethod
+    def start_snapshot():
+        """
+        Все таблицы читаются в одной транзакции, чтобы файлы отражали один
+        снимок базы. В PostgreSQL транзакция переводится в REPEATABLE READ
+        только для чтения, в SQLite снимок даёт сама транзакция.
+        """
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY'
+                )
+
+    def export_files(self, path, options):
+        for csv_file, model, columns in self.get_export_columns(
+            options['with_passwords']
+        ):
+            started = time.perf_counter()
+            if options['gzip']:
+                csv_path = path / f'{csv_file}.gz'
+                csvfile = gzip.open(
+                    csv_path, 'wt', newline='', encoding='utf-8'
+                )
+            else:
+                csv_path = path / csv_file
+                csvfile = open(csv_path, 'w', newline='', encoding='utf-8')
+            with csvfile:
+                exported = self.export_data(
+                    csvfile, model, columns, options['chunk_size']
+                )
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{csv_path.name}: {exported} записей за {elapsed:.2f} с'
+            )
+
+    @staticmethod
+    def format_value(value):
+        if value is None:
+            return ''
+        if hasattr(value, 'isoformat'):
+            return value.isoformat().replace('+00:00', 'Z')
+        return value
+
+    def export_data(self, csvfile, model, columns, chunk_size):
+        header, fields = zip(*columns)
+        writer = csv.writer(csvfile, delimiter=',', quotechar='"')
+        writer.writerow(header)
+        exported = 0
+        rows = model.objects.values_list(*fields).order_by('pk')
+        for row in rows.iterator(chunk_size=chunk_size):
+            writer.writerow([self.format_value(value) for value in row])
+            exported += 1
+        return exported
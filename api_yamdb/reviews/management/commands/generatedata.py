@@ -0,0 +1,255 @@
+import csv
+import random
+import time
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate, islice
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.management.commands.exportdata import Command as ExportCommand
+from reviews.management.commands.importdata import keep_auto_now_add
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.signals import data_imported
+
+User = get_user_model()
+
+WORDS = (
+    'фильм', 'книга', 'сюжет', 'герой', 'финал', 'музыка', 'актёр',
+    'режиссёр', 'сцена', 'диалог', 'атмосфера', 'автор', 'история',
+    'сильный', 'слабый', 'неожиданный', 'скучный', 'яркий', 'тёмный',
+    'смешной', 'грустный', 'долгий', 'короткий', 'отличный', 'странный',
+)
+GENRES_PER_TITLE = (1, 2, 3, 4, 5)
+GENRES_PER_TITLE_WEIGHTS = (30, 35, 20, 10, 5)
+SCORE_WEIGHTS = (2, 1, 2, 3, 5, 7, 10, 14, 12, 8)
+START_DATE = datetime(2015, 1, 1, tzinfo=timezone.utc)
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерация воспроизводимого синтетического набора данных: '
+        'в базу данных или в csv файлы для importdata.'
+    )
+    CHUNK_SIZE = 5000
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Показатель распределения Ципфа для популярности.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', type=Path,
+            help='Каталог для csv файлов. Без него данные пишутся в базу.',
+        )
+        parser.add_argument(
+            '--with-passwords', action='store_true',
+            help='Задать пользователям пароли вида password<id>.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=self.CHUNK_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.password_column = (
+            options['with_passwords'] or options['output'] is None
+        )
+        if options['output'] is None and any(
+            model.objects.exists()
+            for model in (User, Category, Genre, Title, Review, Comment)
+        ):
+            raise CommandError(
+                'Генерация в базу возможна только в пустую базу данных!'
+            )
+        generators = {
+            User: self.generate_users,
+            Category: self.generate_categories,
+            Genre: self.generate_genres,
+            Title: self.generate_titles,
+            Title.genre.through: self.generate_title_genres,
+            Review: self.generate_reviews,
+            Comment: self.generate_comments,
+        }
+        for csv_file, model, columns in ExportCommand.get_export_columns(
+            self.password_column
+        ):
+            started = time.perf_counter()
+            rows = generators[model]()
+            if options['output'] is None:
+                written = self.write_db(model, columns, rows)
+            else:
+                written = self.write_csv(csv_file, columns, rows)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{csv_file}: {written} записей за {elapsed:.2f} с'
+            )
+        if options['output'] is None:
+            Title.recalculate_ratings()
+        self.stdout.write(self.style.SUCCESS('Данные сгенерированы.'))
+
+    def write_csv(self, csv_file, columns, rows):
+        path = self.options['output']
+        path.mkdir(parents=True, exist_ok=True)
+        written = 0
+        with open(path / csv_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, delimiter=',', quotechar='"')
+            writer.writerow(header for header, _ in columns)
+            for row in rows:
+                writer.writerow(
+                    ExportCommand.format_value(value) for value in row
+                )
+                written += 1
+        return written
+
+    def write_db(self, model, columns, rows):
+        fields = [field for _, field in columns]
+        chunk_size = self.options['chunk_size']
+        written = 0
+        with transaction.atomic(), keep_auto_now_add(model):
+            objects = (model(**dict(zip(fields, row))) for row in rows)
+            for chunk in iter(lambda: list(islice(objects, chunk_size)), []):
+                model.objects.bulk_create(chunk)
+                written += len(chunk)
+        data_imported.send(sender=model)
+        return written
+
+    def zipf_weights(self, count):
+        return list(accumulate(
+            1 / rank ** self.options['zipf'] for rank in range(1, count + 1)
+        ))
+
+    def choose(self, cum_weights):
+        """Номер (с единицы) элемента, выбранного по накопленным весам."""
+        point = self.rng.random() * cum_weights[-1]
+        return bisect_left(cum_weights, point) + 1
+
+    def text(self, words):
+        return ' '.join(self.rng.choices(WORDS, k=words)).capitalize() + '.'
+
+    def pub_date(self):
+        return START_DATE + timedelta(seconds=self.rng.randrange(10 ** 8))
+
+    def get_password(self, pk):
+        if not self.options['with_passwords']:
+            return make_password(None)
+        if self.options['output'] is None:
+            return make_password(f'password{pk}')
+        return f'password{pk}'
+
+    def generate_users(self):
+        for pk in range(1, self.options['users'] + 1):
+            role = self.rng.choices(
+                (User.USER, User.MODERATOR, User.ADMIN), (97, 2, 1)
+            )[0]
+            row = (pk, f'user{pk}', f'user{pk}@yamdb.fake', role, '', '', '')
+            if self.password_column:
+                row += (self.get_password(pk),)
+            yield row
+
+    def generate_categories(self):
+        for pk in range(1, self.options['categories'] + 1):
+            yield pk, f'Категория {pk}', f'category-{pk}'
+
+    def generate_genres(self):
+        for pk in range(1, self.options['genres'] + 1):
+            yield pk, f'Жанр {pk}', f'genre-{pk}'
+
+    def generate_titles(self):
+        category_weights = self.zipf_weights(self.options['categories'])
+        current_year = datetime.now().year
+        for pk in range(1, self.options['titles'] + 1):
+            yield (
+                pk,
+                f'{self.text(2)[:-1]} {pk}',
+                self.rng.randint(1900, current_year),
+                self.choose(category_weights)
+                if self.options['categories'] else None,
+                self.text(self.rng.randint(5, 30)),
+            )
+
+    def generate_title_genres(self):
+        genres = self.options['genres']
+        if not genres:
+            return
+        genre_weights = self.zipf_weights(genres)
+        pk = 0
+        for title in range(1, self.options['titles'] + 1):
+            fan_out = self.rng.choices(
+                GENRES_PER_TITLE, GENRES_PER_TITLE_WEIGHTS
+            )[0]
+            title_genres = set()
+            while len(title_genres) < min(fan_out, genres):
+                title_genres.add(self.choose(genre_weights))
+            for genre in sorted(title_genres):
+                pk += 1
+                yield pk, title, genre
+
+    def get_review_counts(self):
+        """
+        Распределяет отзывы по произведениям по закону Ципфа. Одно
+        произведение не может получить больше отзывов, чем есть
+        пользователей.
+        """
+        users = self.options['users']
+        titles = self.options['titles']
+        if not users or not titles:
+            return Counter()
+        title_weights = self.zipf_weights(titles)
+        popularity = list(range(1, titles + 1))
+        self.rng.shuffle(popularity)
+        counts = Counter(
+            popularity[self.choose(title_weights) - 1]
+            for _ in range(self.options['reviews'])
+        )
+        capped = Counter({
+            title: min(count, users) for title, count in counts.items()
+        })
+        dropped = self.options['reviews'] - sum(capped.values())
+        if dropped:
+            self.stdout.write(self.style.WARNING(
+                f'{dropped} отзывов не сгенерировано: у произведения не '
+                'может быть больше отзывов, чем пользователей.'
+            ))
+        return capped
+
+    def generate_reviews(self):
+        users = self.options['users']
+        counts = self.get_review_counts()
+        self.review_count = 0
+        for title in sorted(counts):
+            for author in self.rng.sample(range(1, users + 1), counts[title]):
+                self.review_count += 1
+                yield (
+                    self.review_count,
+                    title,
+                    self.text(self.rng.randint(5, 40)),
+                    author,
+                    self.rng.choices(range(1, 11), SCORE_WEIGHTS)[0],
+                    self.pub_date(),
+                )
+
+    def generate_comments(self):
+        if not self.review_count:
+            return
+        for pk in range(1, self.options['comments'] + 1):
+            yield (
+                pk,
+                self.rng.randint(1, self.review_count),
+                self.text(self.rng.randint(3, 20)),
+                self.rng.randint(1, self.options['users']),
+                self.pub_date(),
+            )
@@ -0,0 +1,58 @@
+# Generated by Django 3.2 on 2026-10-18 18:51
+
+from django.db import migrations, models
+from django.db.models import (Case, Count, F, FloatField, OuterRef,
+                              Subquery, Sum, When)
+from django.db.models.functions import Cast, Coalesce
+
+
+def fill_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    reviews = Review.objects.filter(title=OuterRef('pk')).order_by()
+    Title.objects.update(
+        score_sum=Coalesce(Subquery(
+            reviews.values('title').annotate(total=Sum('score'))
+            .values('total')
+        ), 0),
+        review_count=Coalesce(Subquery(
+            reviews.values('title').annotate(total=Count('pk'))
+            .values('total')
+        ), 0),
+    )
+    Title.objects.update(
+        rating=Case(
+            When(review_count=0, then=None),
+            default=(
+                Cast(F('score_sum'), FloatField())
+                / Cast(F('review_count'), FloatField())
+            ),
+            output_field=FloatField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Рейтинг произведения'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2 on 2026-10-18 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportedRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100, verbose_name='Модель')),
+                ('key', models.CharField(max_length=64, verbose_name='Ключ строки')),
+                ('digest', models.CharField(max_length=40, verbose_name='Хеш содержимого')),
+            ],
+            options={
+                'verbose_name': 'импортированная строка',
+                'verbose_name_plural': 'импортированные строки',
+                'unique_together': {('model', 'key')},
+            },
+        ),
+    ]
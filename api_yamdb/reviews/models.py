@@ -1,6 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (Case, Count, F, FloatField, OuterRef, Subquery,
+                              Sum, When)
+from django.db.models.functions import Cast, Coalesce
 
 from api_yamdb import settings
 from reviews.validators import validate_year
@@ -63,15 +66,75 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Жанр произведения'
     )
+    score_sum = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Сумма оценок'
+    )
+    review_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Количество отзывов'
+    )
+    rating = models.FloatField(
+        null=True, blank=True, editable=False,
+        verbose_name='Рейтинг произведения'
+    )
 
     class Meta:
         ordering = ('pk',)
         verbose_name = 'произведение'
         verbose_name_plural = 'произведения'
+        indexes = (
+            models.Index(fields=('rating', 'id'), name='title_rating_idx'),
+            models.Index(
+                fields=('review_count', 'id'), name='title_review_count_idx',
+            ),
+        )
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def update_rating(cls, title_id, score_delta, count_delta):
+        """
+        Сдвигает сумму оценок и число отзывов, пересчитывая рейтинг.
+        Возвращает число обновлённых произведений.
+        """
+        score_sum = F('score_sum') + score_delta
+        review_count = F('review_count') + count_delta
+        return cls.objects.filter(pk=title_id).update(
+            score_sum=score_sum,
+            review_count=review_count,
+            rating=Case(
+                When(review_count__lte=-count_delta, then=None),
+                default=(
+                    Cast(score_sum, FloatField())
+                    / Cast(review_count, FloatField())
+                ),
+                output_field=FloatField(),
+            ),
+        )
+
+    @classmethod
+    def recalculate_ratings(cls, queryset=None):
+        """Полностью пересчитывает рейтинг по таблице отзывов."""
+        if queryset is None:
+            queryset = cls.objects.all()
+        reviews = Review.objects.filter(title=OuterRef('pk')).order_by()
+        score_sum = reviews.values('title').annotate(total=Sum('score'))
+        review_count = reviews.values('title').annotate(total=Count('pk'))
+        queryset.update(
+            score_sum=Coalesce(Subquery(score_sum.values('total')), 0),
+            review_count=Coalesce(Subquery(review_count.values('total')), 0),
+        )
+        queryset.update(
+            rating=Case(
+                When(review_count=0, then=None),
+                default=(
+                    Cast(F('score_sum'), FloatField())
+                    / Cast(F('review_count'), FloatField())
+                ),
+                output_field=FloatField(),
+            ),
+        )
+
 
 class Review(models.Model):
     title = models.ForeignKey(
@@ -103,6 +166,30 @@ class Review(models.Model):
         verbose_name = 'отзыв'
         verbose_name_plural = 'отзывы'
         unique_together = ('title', 'author')
+        indexes = (
+            models.Index(
+                fields=('title', '-pub_date', '-id'),
+                name='review_title_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'title'), name='review_author_title_idx',
+            ),
+        )
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            if self._state.adding:
+                if not Title.update_rating(self.title_id, self.score, 1):
+                    raise Title.DoesNotExist(
+                        'Произведение для отзыва не найдено.'
+                    )
+                super().save(*args, **kwargs)
+                return
+            old_score = Review.objects.filter(pk=self.pk).values('score')
+            Title.update_rating(
+                self.title_id, self.score - Subquery(old_score), 0
+            )
+            super().save(*args, **kwargs)
 
 
 class Comment(models.Model):
@@ -127,3 +214,20 @@ class Comment(models.Model):
         ordering = ('-pub_date',)
         verbose_name = 'комментарий'
         verbose_name_plural = 'комментарии'
+        indexes = (
+            models.Index(
+                fields=('review', '-pub_date', '-id'),
+                name='comment_review_pub_date_idx',
+            ),
+        )
+
+
+class ImportedRow(models.Model):
+    model = models.CharField(max_length=100, verbose_name='Модель')
+    key = models.CharField(max_length=64, verbose_name='Ключ строки')
+    digest = models.CharField(max_length=40, verbose_name='Хеш содержимого')
+
+    class Meta:
+        verbose_name = 'импортированная строка'
+        verbose_name_plural = 'импортированные строки'
+        unique_together = ('model', 'key')
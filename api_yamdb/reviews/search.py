@@ -0,0 +1,156 @@
+"""
+Полнотекстовый поиск по названию и описанию произведений.
+
+На SQLite используется внешняя FTS5-таблица, на PostgreSQL — колонка
+tsvector с GIN-индексом. Индекс поддерживается триггерами базы данных,
+поэтому в синхронизации участвуют и bulk_create, и update().
+"""
+from django.db import connections
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'russian'
+FTS_TABLE = 'reviews_title_fts'
+SQLITE_TRIGGERS = {
+    'reviews_title_fts_insert': (
+        'AFTER INSERT ON reviews_title BEGIN '
+        'INSERT INTO reviews_title_fts(rowid, name, description) '
+        'VALUES (new.id, new.name, new.description); END'
+    ),
+    'reviews_title_fts_delete': (
+        'AFTER DELETE ON reviews_title BEGIN '
+        'INSERT INTO reviews_title_fts'
+        '(reviews_title_fts, rowid, name, description) '
+        "VALUES ('delete', old.id, old.name, old.description); END"
+    ),
+    'reviews_title_fts_update': (
+        'AFTER UPDATE OF name, description ON reviews_title BEGIN '
+        'INSERT INTO reviews_title_fts'
+        '(reviews_title_fts, rowid, name, description) '
+        "VALUES ('delete', old.id, old.name, old.description); "
+        'INSERT INTO reviews_title_fts(rowid, name, description) '
+        'VALUES (new.id, new.name, new.description); END'
+    ),
+}
+POSTGRESQL_VECTOR = (
+    "setweight(to_tsvector('{config}', coalesce({row}name, '')), 'A') || "
+    "setweight(to_tsvector('{config}', coalesce({row}description, '')), 'B')"
+)
+POSTGRESQL_INSTALL = (
+    'ALTER TABLE reviews_title ADD COLUMN IF NOT EXISTS search_vector '
+    'tsvector',
+    'CREATE INDEX IF NOT EXISTS reviews_title_search_idx ON reviews_title '
+    'USING GIN (search_vector)',
+    'CREATE OR REPLACE FUNCTION reviews_title_search_update() '
+    'RETURNS trigger AS $$ BEGIN NEW.search_vector := {}; RETURN NEW; END '
+    '$$ LANGUAGE plpgsql'.format(
+        POSTGRESQL_VECTOR.format(config=SEARCH_CONFIG, row='NEW.')
+    ),
+    'DROP TRIGGER IF EXISTS reviews_title_search_update ON reviews_title',
+    'CREATE TRIGGER reviews_title_search_update BEFORE INSERT OR UPDATE OF '
+    'name, description ON reviews_title FOR EACH ROW '
+    'EXECUTE PROCEDURE reviews_title_search_update()',
+    'UPDATE reviews_title SET search_vector = {}'.format(
+        POSTGRESQL_VECTOR.format(config=SEARCH_CONFIG, row='')
+    ),
+)
+POSTGRESQL_UNINSTALL = (
+    'DROP TRIGGER IF EXISTS reviews_title_search_update ON reviews_title',
+    'DROP FUNCTION IF EXISTS reviews_title_search_update()',
+    'ALTER TABLE reviews_title DROP COLUMN IF EXISTS search_vector',
+)
+
+
+def install(connection):
+    """Создаёт поисковый индекс и триггеры и заполняет индекс."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for sql in POSTGRESQL_INSTALL:
+                cursor.execute(sql)
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+                "name, description, content='reviews_title', "
+                "content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+            )
+            install_sqlite_triggers(cursor)
+
+
+def install_sqlite_triggers(cursor):
+    for name, sql in SQLITE_TRIGGERS.items():
+        cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {sql}')
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def uninstall(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for sql in POSTGRESQL_UNINSTALL:
+                cursor.execute(sql)
+        elif connection.vendor == 'sqlite':
+            for name in SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def repair(connection):
+    """
+    SQLite пересоздаёт таблицу при изменении её схемы и теряет триггеры.
+    Если поисковый индекс есть, а триггеров нет, они создаются заново, а
+    индекс перестраивается.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master WHERE "
+            "(type = 'table' AND name = %s) OR type = 'trigger'",
+            (FTS_TABLE,),
+        )
+        names = {name for _, name in cursor.fetchall()}
+        if FTS_TABLE in names and not set(SQLITE_TRIGGERS) <= names:
+            install_sqlite_triggers(cursor)
+
+
+def get_match_query(query):
+    """Слова запроса в виде строк FTS5: все слова должны встретиться."""
+    return ' '.join(
+        '"{}"'.format(word.replace('"', '""')) for word in query.split()
+    )
+
+
+def search_titles(queryset, query):
+    """
+    Оставляет произведения, подходящие под запрос, и сортирует их по
+    релевантности (поле search_rank, больше — лучше).
+    """
+    connection = connections[queryset.db]
+    if not query.split():
+        return queryset
+    if connection.vendor == 'postgresql':
+        tsquery = f"plainto_tsquery('{SEARCH_CONFIG}', %s)"
+        matches = RawSQL(
+            f'SELECT id FROM reviews_title WHERE search_vector @@ {tsquery}',
+            (query,),
+        )
+        rank = RawSQL(
+            f'ts_rank("reviews_title"."search_vector", {tsquery})',
+            (query,),
+            output_field=FloatField(),
+        )
+    else:
+        match = get_match_query(query)
+        matches = RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            (match,),
+        )
+        rank = RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s '
+            f'AND rowid = "reviews_title"."id"',
+            (match,),
+            output_field=FloatField(),
+        )
+    return queryset.filter(pk__in=matches).annotate(
+        search_rank=rank
+    ).order_by('-search_rank', 'pk')
@@ -0,0 +1,81 @@
+import threading
+
+from django.db import connections
+from django.db.models.signals import (post_delete, post_migrate,
+                                      pre_delete)
+from django.dispatch import Signal, receiver
+
+from reviews import search
+from reviews.models import Review, Title, User
+
+data_imported = Signal()
+ratings_recalculated = Signal()
+
+cascade = threading.local()
+
+
+def get_cascade():
+    """Отзывы, удаляемые каскадом, и произведения для пересчёта."""
+    if not hasattr(cascade, 'reviews'):
+        cascade.reviews = set()
+        cascade.titles = {}
+    return cascade
+
+
+@receiver(pre_delete, sender=Review)
+def review_deleting(sender, instance, **kwargs):
+    """
+    Отзывы удаляются раньше пользователя или произведения, поэтому здесь
+    начинается новое удаление: каскад прерванного или откаченного удаления
+    больше не действует и не должен отменять пересчёт рейтинга.
+    """
+    state = get_cascade()
+    state.reviews.clear()
+    state.titles.clear()
+
+
+@receiver(pre_delete, sender=User)
+@receiver(pre_delete, sender=Title)
+def reviews_cascade_started(sender, instance, **kwargs):
+    """
+    Отзывы удаляемого пользователя или произведения уходят каскадом:
+    вместо UPDATE на каждый отзыв рейтинг затронутых произведений
+    пересчитывается один раз после удаления, а удаляемые произведения
+    не обновляются вовсе.
+    """
+    field = 'author' if sender is User else 'title'
+    rows = Review.objects.filter(**{field: instance}).values_list(
+        'pk', 'title_id'
+    )
+    state = get_cascade()
+    titles = set()
+    for pk, title_id in rows:
+        state.reviews.add(pk)
+        titles.add(title_id)
+    if sender is User and titles:
+        state.titles[sender, instance.pk] = titles
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Title)
+def reviews_cascade_finished(sender, instance, **kwargs):
+    titles = get_cascade().titles.pop((sender, instance.pk), None)
+    if titles:
+        Title.recalculate_ratings(Title.objects.filter(pk__in=titles))
+        ratings_recalculated.send(sender=Title, title_ids=titles)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    reviews = get_cascade().reviews
+    if instance.pk in reviews:
+        reviews.discard(instance.pk)
+        instance.deleted_by_cascade = True
+        return
+    Title.update_rating(instance.title_id, -instance.score, -1)
+
+
+@receiver(post_migrate)
+def repair_title_search(sender, using, **kwargs):
+    if sender.name == 'reviews':
+        search.repair(connections[using])
@@ -0,0 +1,91 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import OutboxEmail
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправка писем из очереди пачками: одно соединение с почтовым '
+        'сервером на пачку, неудачные письма откладываются с растущей '
+        'задержкой.'
+    )
+    BATCH_SIZE = 100
+    MAX_ATTEMPTS = 10
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=self.BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=self.MAX_ATTEMPTS,
+            help='После стольких неудач письмо больше не отправляется.',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а ждать новые письма.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста (для --loop).',
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = self.send_batch(
+                options['batch_size'], options['max_attempts']
+            )
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(
+            f'Отправлено писем: {total_sent}, отложено: {total_failed}.'
+        )
+
+    def send_batch(self, batch_size, max_attempts):
+        """
+        Отправляет одну пачку готовых к отправке писем. Строки блокируются
+        до конца пачки, поэтому несколько обработчиков не отправят одно
+        письмо дважды.
+        """
+        with transaction.atomic():
+            emails = list(
+                OutboxEmail.objects.select_for_update(skip_locked=True)
+                .filter(
+                    attempts__lt=max_attempts,
+                    next_attempt__lte=timezone.now(),
+                )
+                .order_by('pk')[:batch_size]
+            )
+            if not emails:
+                return 0, 0
+            sent = []
+            failed = []
+            try:
+                with get_connection(fail_silently=False) as connection:
+                    for email in emails:
+                        try:
+                            email.as_message(connection).send()
+                        except Exception as error:
+                            email.schedule_retry(error)
+                            failed.append(email)
+                        else:
+                            sent.append(email.pk)
+            except Exception as error:
+                for email in emails[len(sent) + len(failed):]:
+                    email.schedule_retry(error)
+                    failed.append(email)
+            OutboxEmail.objects.filter(pk__in=sent).delete()
+            OutboxEmail.objects.bulk_update(
+                failed, ('attempts', 'next_attempt', 'last_error')
+            )
+        return len(sent), len(failed)
@@ -0,0 +1,26 @@
+# Generated by Django 3.2 on 2026-10-18 19:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConfirmationCode',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='confirmation_code', serialize=False, to='users.user', verbose_name='Пользователь')),
+                ('digest', models.CharField(max_length=64, verbose_name='HMAC кода')),
+                ('created', models.DateTimeField(verbose_name='Дата выдачи')),
+            ],
+            options={
+                'verbose_name': 'Код подтверждения',
+                'verbose_name_plural': 'Коды подтверждения',
+            },
+        ),
+    ]
@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.core.mail import EmailMessage
 from django.db import models
+from django.utils import timezone
+from django.utils.crypto import get_random_string, salted_hmac
 
 
 class User(AbstractUser):
@@ -14,6 +18,9 @@ class User(AbstractUser):
     email = models.EmailField('Электронная почта', unique=True, max_length=254)
     bio = models.TextField('Биография', blank=True)
     role = models.CharField('Роль', max_length=25, choices=ROLES, default=USER)
+    token_version = models.PositiveIntegerField(
+        'Версия токенов', default=0, editable=False
+    )
 
     class Meta:
         ordering = ('pk',)
@@ -25,3 +32,95 @@ class User(AbstractUser):
     @property
     def is_moderator(self):
         return self.role == self.MODERATOR
+
+
+class ConfirmationCode(models.Model):
+    """
+    Одноразовый код подтверждения. Хранится HMAC кода: код случайный и
+    живёт недолго, поэтому медленный хеш паролей ему не нужен.
+    """
+    KEY_SALT = 'users.ConfirmationCode'
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='confirmation_code',
+        verbose_name='Пользователь',
+    )
+    digest = models.CharField('HMAC кода', max_length=64)
+    created = models.DateTimeField('Дата выдачи')
+
+    class Meta:
+        verbose_name = 'Код подтверждения'
+        verbose_name_plural = 'Коды подтверждения'
+
+    @classmethod
+    def get_digest(cls, code):
+        return salted_hmac(
+            cls.KEY_SALT, str(code), algorithm='sha256'
+        ).hexdigest()
+
+    @classmethod
+    def issue(cls, user):
+        """Выдаёт новый код, заменяя предыдущий."""
+        code = get_random_string(settings.CONFIRMATION_CODE_LENGTH)
+        cls.objects.update_or_create(
+            user=user,
+            defaults={
+                'digest': cls.get_digest(code),
+                'created': timezone.now(),
+            },
+        )
+        return code
+
+    @classmethod
+    def redeem(cls, user, code):
+        """
+        Проверяет и гасит код одним DELETE, поэтому код нельзя
+        использовать дважды даже при одновременных запросах.
+        """
+        deleted, _ = cls.objects.filter(
+            user=user,
+            digest=cls.get_digest(code),
+            created__gte=timezone.now() - settings.CONFIRMATION_CODE_TTL,
+        ).delete()
+        return bool(deleted)
+
+
+class OutboxEmail(models.Model):
+    """Письмо в очереди на отправку командой sendoutbox."""
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254)
+    recipient = models.EmailField('Получатель', max_length=254)
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField('Попыток отправки', default=0)
+    next_attempt = models.DateTimeField(
+        'Следующая попытка', default=timezone.now, db_index=True
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ('pk',)
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+
+    def as_message(self, connection):
+        return EmailMessage(
+            subject=self.subject,
+            body=self.body,
+            from_email=self.from_email,
+            to=[self.recipient],
+            connection=connection,
+        )
+
+    def schedule_retry(self, error):
+        """Откладывает следующую попытку с экспоненциальной задержкой."""
+        self.attempts += 1
+        delay = min(
+            settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (self.attempts - 1),
+            settings.EMAIL_OUTBOX_MAX_RETRY_DELAY,
+        )
+        self.next_attempt = timezone.now() + delay
+        self.last_error = str(error)
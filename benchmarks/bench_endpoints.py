@@ -0,0 +1,400 @@
+"""
+Нагрузочный прогон всех эндпоинтов `api/urls.py` через тестовый клиент
+Django на сгенерированном наборе данных.
+
+Для каждого эндпоинта считаются запросы в секунду, перцентили задержки
+p50/p95/p99, число SQL-запросов и пик выделенной памяти. Память
+измеряется отдельным коротким прогоном, чтобы tracemalloc не искажал
+задержки. Объекты для удаления и повторных отзывов создаются до запроса
+и в замеры не попадают. Отчёт пишется в JSON и может сравниваться с
+сохранённым базовым отчётом:
+
+    python benchmarks/bench_endpoints.py --output report.json
+    python benchmarks/bench_endpoints.py --baseline report.json
+
+Настройки проекта берутся из окружения, например JWT_ROLE_CLAIMS=True
+или ACCESS_TOKEN_CACHE_SIZE=1024 (без CACHE_BACKEND для них используется
+файловый кеш).
+
+При найденных регрессиях скрипт завершается с кодом 1.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import StringIO
+from itertools import count
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / 'api_yamdb'))
+
+DATASET = {
+    'users': 500, 'categories': 5, 'genres': 30, 'titles': 2000,
+    'reviews': 20000, 'comments': 20000,
+}
+TOLERANCE = 0.25
+MEMORY_ITERATIONS = 20
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    index = round(percent / 100 * (len(values) - 1))
+    return values[index]
+
+
+def created(context, kind, template):
+    """Адрес нового объекта: объект создаётся до начала замера."""
+    return lambda: template.format(o=context['create'](kind))
+
+
+def get_scenarios(context):
+    """
+    Сценарии в виде (имя, клиент, метод, url, функция данных). Вместо url
+    можно передать функцию, которая готовит объект и возвращает его адрес.
+    """
+    title = f'/api/v1/titles/{context["title_id"]}/'
+    review = f'{title}reviews/{context["review_id"]}/'
+    comment = f'{review}comments/{context["comment_id"]}/'
+    popular = f'/api/v1/titles/{context["popular_title_id"]}/reviews/'
+    new_review = '/api/v1/titles/{o.title_id}/reviews/{o.pk}/'
+    category = context['category_slug']
+    genre = context['genre_slug']
+    numbers = count()
+
+    def signup_data():
+        number = next(numbers)
+        return {
+            'username': f'bench{number}',
+            'email': f'bench{number}@yamdb.fake',
+        }
+
+    def title_data():
+        return {
+            'name': f'Произведение {next(numbers)}', 'year': 2000,
+            'category': category, 'genre': [genre],
+        }
+
+    def slug_data():
+        number = next(numbers)
+        return {'name': f'Справочник {number}', 'slug': f'bench-{number}'}
+
+    def review_data():
+        return {'text': f'Отзыв {next(numbers)}', 'score': 7}
+
+    def comment_data():
+        return {'text': f'Комментарий {next(numbers)}'}
+
+    def bio_data():
+        return {'bio': f'О себе {next(numbers)}'}
+
+    return (
+        ('titles-list', 'anon', 'get', '/api/v1/titles/', None),
+        ('titles-list-auth', 'admin', 'get', '/api/v1/titles/', None),
+        ('titles-list-filtered', 'admin', 'get',
+         f'/api/v1/titles/?genre={genre}&category={category}', None),
+        ('titles-list-cursor', 'admin', 'get',
+         '/api/v1/titles/?pagination=cursor', None),
+        ('titles-detail', 'admin', 'get', title, None),
+        ('titles-create', 'admin', 'post', '/api/v1/titles/', title_data),
+        ('titles-update', 'admin', 'patch', title, title_data),
+        ('titles-delete', 'admin', 'delete',
+         created(context, 'title', '/api/v1/titles/{o.pk}/'), None),
+        ('autocomplete', 'anon', 'get',
+         f'/api/v1/autocomplete/?q={context["title_prefix"]}', None),
+        ('genres-list', 'anon', 'get', '/api/v1/genres/', None),
+        ('genres-search', 'admin', 'get', '/api/v1/genres/?search=Жанр',
+         None),
+        ('genres-create', 'admin', 'post', '/api/v1/genres/', slug_data),
+        ('genres-delete', 'admin', 'delete',
+         created(context, 'genre', '/api/v1/genres/{o.slug}/'), None),
+        ('categories-list', 'anon', 'get', '/api/v1/categories/', None),
+        ('categories-create', 'admin', 'post', '/api/v1/categories/',
+         slug_data),
+        ('categories-delete', 'admin', 'delete',
+         created(context, 'category', '/api/v1/categories/{o.slug}/'), None),
+        ('reviews-list', 'admin', 'get', popular, None),
+        ('reviews-list-last-page', 'admin', 'get',
+         f'{popular}?page={context["last_page"]}', None),
+        ('reviews-detail', 'admin', 'get', review, None),
+        ('reviews-create', 'admin', 'post',
+         created(context, 'title', '/api/v1/titles/{o.pk}/reviews/'),
+         review_data),
+        ('reviews-update', 'admin', 'patch', review, review_data),
+        ('reviews-delete', 'admin', 'delete',
+         created(context, 'review', new_review), None),
+        ('comments-list', 'admin', 'get', f'{review}comments/', None),
+        ('comments-detail', 'admin', 'get', comment, None),
+        ('comments-create', 'admin', 'post', f'{review}comments/',
+         comment_data),
+        ('comments-update', 'admin', 'patch', comment, comment_data),
+        ('comments-delete', 'admin', 'delete',
+         created(context, 'comment', f'{review}comments/{{o.pk}}/'), None),
+        ('users-list', 'admin', 'get', '/api/v1/users/', None),
+        ('users-detail', 'admin', 'get',
+         f'/api/v1/users/{context["username"]}/', None),
+        ('users-create', 'admin', 'post', '/api/v1/users/', signup_data),
+        ('users-delete', 'admin', 'delete',
+         created(context, 'user', '/api/v1/users/{o.username}/'), None),
+        ('users-me', 'admin', 'get', '/api/v1/users/me/', None),
+        ('users-me-update', 'admin', 'patch', '/api/v1/users/me/',
+         bio_data),
+        ('auth-signup', 'anon', 'post', '/api/v1/auth/signup/',
+         signup_data),
+        ('auth-token', 'anon', 'post', '/api/v1/auth/token/',
+         context['token_data']),
+    )
+
+
+def prepare_request(url, data_factory):
+    """Адрес и тело запроса; подготовка объектов не входит в замеры."""
+    url = url() if callable(url) else url
+    return url, data_factory() if data_factory else None
+
+
+def send(client, method, url, data):
+    if method == 'get':
+        response = client.get(url, data=data)
+    else:
+        response = getattr(client, method)(url, data=data, format='json')
+    assert response.status_code < 400, (
+        f'{method.upper()} {url}: {response.status_code}'
+    )
+
+
+def measure(client, method, url, data_factory, iterations):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    latencies = []
+    queries = []
+    for _ in range(iterations):
+        request_url, data = prepare_request(url, data_factory)
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            send(client, method, request_url, data)
+            latencies.append(time.perf_counter() - started)
+        queries.append(len(context.captured_queries))
+
+    peak = 0
+    tracemalloc.start()
+    for _ in range(min(iterations, MEMORY_ITERATIONS)):
+        request_url, data = prepare_request(url, data_factory)
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        send(client, method, request_url, data)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    return {
+        'requests_per_second': round(len(latencies) / sum(latencies), 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'queries': max(queries),
+        'queries_mean': round(statistics.mean(queries), 1),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(clients, context, iterations):
+    return {
+        name: measure(clients[client], method, url, data, iterations)
+        for name, client, method, url, data in get_scenarios(context)
+    }
+
+
+def compare(report, baseline, tolerance=TOLERANCE):
+    """Список регрессий относительно базового отчёта."""
+    regressions = []
+    for name, result in report.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result['queries'] > base['queries']:
+            regressions.append(
+                f'{name}: SQL-запросов {base["queries"]} -> '
+                f'{result["queries"]}'
+            )
+        if result['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(
+                f'{name}: p95 {base["p95_ms"]} мс -> {result["p95_ms"]} мс'
+            )
+        if (result['requests_per_second']
+                < base['requests_per_second'] * (1 - tolerance)):
+            regressions.append(
+                f'{name}: rps {base["requests_per_second"]} -> '
+                f'{result["requests_per_second"]}'
+            )
+        if result['peak_memory_kb'] > base['peak_memory_kb'] * (1 + tolerance):
+            regressions.append(
+                f'{name}: память {base["peak_memory_kb"]} КиБ -> '
+                f'{result["peak_memory_kb"]} КиБ'
+            )
+    return regressions
+
+
+def prepare_context():
+    """Клиенты и идентификаторы объектов для сценариев."""
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIClient
+
+    from api.authentication import get_access_token
+    from reviews.models import Category, Comment, Genre, Review, Title
+    from users.models import ConfirmationCode
+
+    User = get_user_model()
+    admin = User.objects.create_user(
+        username='bench-admin', email='bench-admin@yamdb.fake', role='admin'
+    )
+    admin_client = APIClient()
+    admin_client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {get_access_token(admin)}'
+    )
+    token_user = User.objects.create_user(
+        username='bench-token', email='bench-token@yamdb.fake'
+    )
+
+    def token_data():
+        return {
+            'username': token_user.username,
+            'confirmation_code': ConfirmationCode.issue(token_user),
+        }
+
+    comment = Comment.objects.select_related('review__title').first()
+    numbers = count()
+
+    def create(kind):
+        """Новый объект для сценариев удаления и повторных отзывов."""
+        number = next(numbers)
+        if kind == 'title':
+            return Title.objects.create(name=f'Удаляемое {number}', year=2000)
+        if kind == 'review':
+            return Review.objects.create(
+                title=create('title'), author=admin, text='Отзыв', score=5
+            )
+        if kind == 'comment':
+            return Comment.objects.create(
+                review=comment.review, author=admin, text='Комментарий'
+            )
+        if kind == 'user':
+            return User.objects.create_user(
+                username=f'bench-delete{number}',
+                email=f'bench-delete{number}@yamdb.fake',
+            )
+        model = Genre if kind == 'genre' else Category
+        return model.objects.create(
+            name=f'Удаляемый {number}', slug=f'bench-delete{number}'
+        )
+
+    popular = Title.objects.order_by('-review_count').first()
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    context = {
+        'title_id': comment.review.title_id,
+        'review_id': comment.review_id,
+        'comment_id': comment.pk,
+        'popular_title_id': popular.pk,
+        'last_page': max(-(-popular.review_count // page_size), 1),
+        'username': User.objects.values_list('username', flat=True).first(),
+        'category_slug': Category.objects.values_list(
+            'slug', flat=True
+        ).first(),
+        'genre_slug': Genre.objects.values_list('slug', flat=True).first(),
+        'title_prefix': comment.review.title.name[:3],
+        'token_data': token_data,
+        'create': create,
+    }
+    return {'anon': APIClient(), 'admin': admin_client}, context
+
+
+def print_report(report, regressions):
+    header = (
+        f'{"эндпоинт":<24}{"rps":>9}{"p50":>9}{"p95":>9}{"p99":>9}'
+        f'{"SQL":>6}{"KiB":>9}'
+    )
+    print(header)
+    for name, result in report.items():
+        print(
+            f'{name:<24}{result["requests_per_second"]:>9}'
+            f'{result["p50_ms"]:>9}{result["p95_ms"]:>9}'
+            f'{result["p99_ms"]:>9}{result["queries"]:>6}'
+            f'{result["peak_memory_kb"]:>9}'
+        )
+    for regression in regressions:
+        print(f'РЕГРЕССИЯ {regression}')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path)
+    parser.add_argument('--baseline', type=Path)
+    parser.add_argument(
+        '--tolerance', type=float, default=TOLERANCE,
+        help='Допустимый рост p95 и памяти и падение rps относительно '
+             'базового отчёта.',
+    )
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    os.environ['DB_ENGINE'] = 'django.db.backends.sqlite3'
+    os.environ['DB_NAME'] = str(workdir / 'db.sqlite3')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    if (os.getenv('JWT_ROLE_CLAIMS') == 'True'
+            or int(os.getenv('ACCESS_TOKEN_CACHE_SIZE', 0))):
+        os.environ.setdefault(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache',
+        )
+        os.environ.setdefault('CACHE_LOCATION', str(workdir / 'cache'))
+
+    import django
+    from django.conf import settings
+    django.setup()
+    from django.core.management import call_command
+    from django.test.utils import (setup_test_environment,
+                                   teardown_test_environment)
+
+    from api.authentication import token_cache
+
+    settings.ALLOWED_HOSTS = ['*']
+    setup_test_environment()
+    call_command('migrate', verbosity=0)
+    call_command(
+        'generatedata', seed=args.seed, stdout=StringIO(),
+        **{name: int(value * args.scale) for name, value in DATASET.items()},
+    )
+    clients, context = prepare_context()
+    report = run_benchmarks(clients, context, args.iterations)
+    token_cache_info = token_cache.info()
+    teardown_test_environment()
+
+    regressions = []
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(report, baseline['endpoints'], args.tolerance)
+    print_report(report, regressions)
+    if args.output:
+        args.output.write_text(json.dumps(
+            {
+                'dataset': DATASET,
+                'scale': args.scale,
+                'iterations': args.iterations,
+                'token_cache': token_cache_info,
+                'endpoints': report,
+            },
+            ensure_ascii=False, indent=2,
+        ))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Сравнение скорости `importdata` в обычном режиме и в режиме `--bulk`.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_importdata.py --titles 2000
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / 'api_yamdb'))
+
+
+def count_rows(path):
+    rows = 0
+    for csv_path in path.glob('*.csv'):
+        with open(csv_path, newline='') as csvfile:
+            rows += sum(1 for _ in csv.reader(csvfile)) - 1
+    return rows
+
+
+def run(call_command, path, **options):
+    call_command('flush', interactive=False, verbosity=0)
+    started = time.perf_counter()
+    call_command('importdata', path=path, stdout=StringIO(), **options)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=1000)
+    parser.add_argument(
+        '--with-passwords', action='store_true',
+        help='Заполнить колонку password в users.csv.',
+    )
+    parser.add_argument('--hash-workers', type=int, default=4)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    os.environ['DB_ENGINE'] = 'django.db.backends.sqlite3'
+    os.environ['DB_NAME'] = str(workdir / 'db.sqlite3')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+    import django
+    django.setup()
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+    data_path = workdir / 'data'
+    call_command(
+        'generatedata', output=data_path, titles=args.titles,
+        users=max(args.titles // 10, 10), reviews=args.titles * 5,
+        comments=args.titles * 5, with_passwords=args.with_passwords,
+        stdout=StringIO(),
+    )
+    rows = count_rows(data_path)
+    print(f'Строк в наборе данных: {rows}')
+    modes = [('обычный режим', {}), ('--bulk', {'bulk': True})]
+    if args.with_passwords:
+        modes += [
+            (
+                f'--bulk --hash-workers {args.hash_workers}',
+                {'bulk': True, 'hash_workers': args.hash_workers},
+            ),
+            (
+                '--bulk --passwords unusable',
+                {'bulk': True, 'passwords': 'unusable'},
+            ),
+        ]
+    for name, options in modes:
+        elapsed = run(call_command, data_path, **options)
+        print(f'{name}: {elapsed:.2f} с, {rows / elapsed:.0f} строк/с')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +34,34 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    from api.authentication import token_cache
+    from api.autocomplete import autocomplete_index
+
+    cache.clear()
+    token_cache.clear()
+    autocomplete_index.versions = None
+    yield
+    cache.clear()
+    token_cache.clear()
+
+
+@pytest.fixture
+def token_cache_enabled(settings, tmp_path):
+    """Кеш токенов доступа с общим для процессов файловым кешем."""
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path / 'cache'),
+    }}
+    settings.ACCESS_TOKEN_CACHE_SIZE = 1024
+    return settings.CACHES['default']['LOCATION']
+
+
+@pytest.fixture(autouse=True)
+def send_email_immediately(settings):
+    settings.EMAIL_OUTBOX = False
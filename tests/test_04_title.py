@@ -2,6 +2,7 @@ from http import HTTPStatus
 
 import pytest
 
+from reviews.models import Category, Genre, Title
 from tests.utils import (check_pagination, check_permissions,
                          create_categories, create_genre, create_titles)
 
@@ -316,3 +317,33 @@ class Test04TitleAPI:
                           HTTPStatus.FORBIDDEN)
         check_permissions(moderator_client, url, data, 'модератора',
                           titles, HTTPStatus.FORBIDDEN)
+
+    def test_06_titles_list_query_count(self, client,
+                                        django_assert_num_queries):
+        category = Category.objects.create(name='Фильм', slug='films')
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {idx}', slug=f'genre-{idx}')
+            for idx in range(5)
+        )
+        genres = list(Genre.objects.all())
+        for idx in range(10):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category
+            )
+            title.genre.set(genres)
+        url = '/api/v1/titles/'
+
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert len(data['results']) == 10 and all(
+            len(title['genre']) == 5 and title['category']
+            for title in data['results']
+        ), (
+            f'Проверьте, что GET-запрос к `{url}` возвращает жанры и '
+            'категорию каждого произведения.'
+        )
+
+        with django_assert_num_queries(2):
+            client.get(f'{url}{data["results"][0]["id"]}/')
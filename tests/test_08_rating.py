@@ -0,0 +1,128 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, transaction
+from django.db.models.signals import pre_delete
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def test_01_rating_follows_review_changes(self, client, admin_client,
+                                              admin, user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.review_count) == (10, 2), (
+            'Проверьте, что при создании отзыва у произведения '
+            'обновляются сумма оценок и количество отзывов.'
+        )
+
+        response = user_client.patch(
+            f'{reviews_url}{reviews[1]["id"]}/', data={'score': 9}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(title_url)
+        assert response.json().get('rating') == 7, (
+            'Проверьте, что при изменении оценки в отзыве '
+            'пересчитывается рейтинг произведения.'
+        )
+
+        response = admin_client.delete(f'{reviews_url}{reviews[0]["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count) == (9, 1), (
+            'Проверьте, что при удалении отзыва у произведения '
+            'уменьшаются сумма оценок и количество отзывов.'
+        )
+
+        user.delete()
+        response = client.get(title_url)
+        assert response.json().get('rating') is None, (
+            'Проверьте, что после удаления всех отзывов рейтинг '
+            'произведения становится равным `None`.'
+        )
+
+    def test_02_recalculate_ratings(self, admin_client, admin, user_client,
+                                    user):
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        Title.objects.update(score_sum=0, review_count=0, rating=None)
+
+        Title.recalculate_ratings()
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.review_count, title.rating) == (
+            10, 2, 5
+        ), (
+            'Проверьте, что `Title.recalculate_ratings` восстанавливает '
+            'агрегаты рейтинга по таблице отзывов.'
+        )
+
+    def count_title_updates(self, instance):
+        with CaptureQueriesContext(connection) as context:
+            instance.delete()
+        return sum(
+            query['sql'].startswith('UPDATE "reviews_title"')
+            for query in context.captured_queries
+        )
+
+    def test_03_cascades_in_bulk(self, admin, moderator, user):
+        titles = [
+            Title.objects.create(name=f'Произведение {idx}', year=2000)
+            for idx in range(5)
+        ]
+        for title in titles:
+            for author, score in ((admin, 10), (user, 4)):
+                Review.objects.create(
+                    title=title, author=author, text='Отзыв', score=score
+                )
+        Review.objects.create(
+            title=titles[0], author=moderator, text='Отзыв', score=1
+        )
+        assert self.count_title_updates(user) == 2, (
+            'Проверьте, что при удалении пользователя рейтинг произведений '
+            'с его отзывами пересчитывается одним запросом, а не по запросу '
+            'на отзыв.'
+        )
+        title = Title.objects.get(pk=titles[0].pk)
+        assert (title.score_sum, title.review_count) == (11, 2)
+        assert Title.objects.get(pk=titles[1].pk).rating == 10
+        assert self.count_title_updates(title) == 0, (
+            'Проверьте, что удаление произведения не обновляет рейтинг '
+            'удаляемого произведения.'
+        )
+        review = Review.objects.get(title=titles[1], author=admin)
+        review.delete()
+        assert Title.objects.get(pk=titles[1].pk).review_count == 0
+
+    def test_04_failed_cascade_is_forgotten(self, admin, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        for author, score in ((admin, 10), (user, 4)):
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+
+        def fail(sender, instance, **kwargs):
+            raise RuntimeError('Удаление прервано')
+
+        pre_delete.connect(fail, sender=type(user))
+        try:
+            with pytest.raises(RuntimeError), transaction.atomic():
+                user.delete()
+        finally:
+            pre_delete.disconnect(fail, sender=type(user))
+        Review.objects.get(author=user).delete()
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count, title.rating) == (
+            10, 1, 10
+        ), (
+            'Проверьте, что прерванное удаление пользователя не мешает '
+            'пересчитывать рейтинг при последующем удалении его отзывов.'
+        )
@@ -0,0 +1,78 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CursorPagination:
+
+    def collect_pages(self, client, url):
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{url}` в курсорном режиме '
+                'возвращает ответ со статусом 200.'
+            )
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в курсорном режиме пагинации ответ не '
+                'содержит ключ `count`.'
+            )
+            ids.extend(item['id'] for item in data['results'])
+            url = data['next']
+        return ids
+
+    def test_01_titles_cursor(self, client):
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx}', year=2000) for idx in range(25)
+        )
+        url = '/api/v1/titles/?pagination=cursor'
+        ids = self.collect_pages(client, url)
+        assert ids == list(
+            Title.objects.order_by('pk').values_list('pk', flat=True)
+        ), (
+            f'Проверьте, что курсорная пагинация `{url}` обходит все '
+            'произведения по возрастанию `id` без пропусков и повторов.'
+        )
+
+        response = client.get('/api/v1/titles/?page=3')
+        data = response.json()
+        assert data['count'] == 25 and len(data['results']) == 5, (
+            'Проверьте, что без параметра `pagination=cursor` для '
+            '`/api/v1/titles/` сохраняется постраничная пагинация.'
+        )
+
+    def test_02_reviews_cursor(self, client, django_user_model):
+        title = Title.objects.create(name='Произведение', year=2000)
+        django_user_model.objects.bulk_create(
+            django_user_model(username=f'user{idx}', email=f'{idx}@yamdb.fake')
+            for idx in range(15)
+        )
+        for user in django_user_model.objects.all():
+            Review.objects.create(
+                title=title, author=user, text='text', score=5
+            )
+        Review.objects.update(pub_date=Review.objects.first().pub_date)
+
+        url = f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor'
+        ids = self.collect_pages(client, url)
+        assert ids == sorted(ids, reverse=True) and len(set(ids)) == 15, (
+            f'Проверьте, что курсорная пагинация `{url}` корректно '
+            'обрабатывает отзывы с одинаковой датой публикации.'
+        )
+
+    @pytest.mark.parametrize('query', ('ordering=-rating', 'search=Сталкер'))
+    def test_03_cursor_with_ordering(self, client, query):
+        Title.objects.create(name='Сталкер', year=1979)
+        url = f'/api/v1/titles/?{query}&pagination=cursor'
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что `{url}` не теряет молча порядок сортировки или '
+            'поиска и возвращает ответ со статусом 400.'
+        )
+        assert query.split('=')[0] in response.json()
+        response = client.get(f'/api/v1/titles/?{query}')
+        assert response.status_code == HTTPStatus.OK
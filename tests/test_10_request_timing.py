@@ -0,0 +1,47 @@
+import json
+import logging
+
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10RequestTiming:
+
+    def test_01_timing_headers(self, settings, caplog):
+        settings.REQUEST_TIMING = True
+        Title.objects.create(name='Произведение', year=2000)
+        url = '/api/v1/titles/'
+
+        with caplog.at_level(logging.INFO, logger='api.timing'):
+            response = APIClient().get(url)
+        assert int(response['X-Query-Count']) > 0, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовок `X-Query-Count` с числом SQL-запросов.'
+        )
+        server_timing = response['Server-Timing']
+        for metric in ('db;dur=', 'serializer;dur=', 'total;dur='):
+            assert metric in server_timing, (
+                f'Проверьте, что заголовок `Server-Timing` содержит '
+                f'метрику `{metric}`.'
+            )
+
+        records = [
+            json.loads(record.getMessage()) for record in caplog.records
+            if record.name == 'api.timing'
+        ]
+        assert records and records[-1]['view'] == 'TitleViewSet', (
+            'Проверьте, что в лог пишется строка с именем вьюсета.'
+        )
+        assert records[-1]['action'] == 'list'
+        assert records[-1]['queries'] == int(response['X-Query-Count'])
+
+    def test_02_timing_disabled(self, settings):
+        settings.REQUEST_TIMING = False
+        response = APIClient().get('/api/v1/titles/')
+        assert 'X-Query-Count' not in response, (
+            'Проверьте, что при `REQUEST_TIMING = False` заголовки с '
+            'метриками не добавляются.'
+        )
@@ -0,0 +1,87 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import transaction
+
+from api.cache import get_versions
+from reviews.models import Genre
+from tests.utils import create_genre, create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11CatalogCache:
+
+    def check_cached(self, client, url, django_assert_num_queries):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        with django_assert_num_queries(0):
+            cached = client.get(url)
+        assert cached.json() == response.json(), (
+            f'Проверьте, что повторный GET-запрос анонимного пользователя к '
+            f'`{url}` отдаётся из кеша без запросов к базе данных.'
+        )
+        return response.json()
+
+    def test_01_genres_cache_versioned(self, client, admin_client,
+                                       django_assert_num_queries):
+        url = '/api/v1/genres/'
+        create_genre(admin_client)
+        data = self.check_cached(client, url, django_assert_num_queries)
+        assert data['count'] == 3
+
+        admin_client.post(url, data={'name': 'Вестерн', 'slug': 'western'})
+        data = self.check_cached(client, url, django_assert_num_queries)
+        assert data['count'] == 4, (
+            f'Проверьте, что после создания жанра кеш `{url}` '
+            'перестаёт отдавать устаревшие данные.'
+        )
+        data = self.check_cached(
+            client, f'{url}?search=Вест', django_assert_num_queries
+        )
+        assert data['count'] == 1, (
+            'Проверьте, что ключ кеша учитывает параметры запроса.'
+        )
+
+    def test_02_titles_cache_follows_reviews(self, client, admin_client,
+                                             admin, user_client, user,
+                                             django_assert_num_queries):
+        url = '/api/v1/titles/'
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        self.check_cached(client, url, django_assert_num_queries)
+
+        user_client.patch(
+            f'{url}{titles[0]["id"]}/reviews/{reviews[1]["id"]}/',
+            data={'score': 9}
+        )
+        data = self.check_cached(client, url, django_assert_num_queries)
+        ratings = {title['id']: title['rating'] for title in data['results']}
+        assert ratings[titles[0]['id']] == 7, (
+            f'Проверьте, что изменение отзыва сбрасывает кеш `{url}`.'
+        )
+
+    def test_03_file_based_cache(self, settings, tmp_path, client,
+                                 admin_client, django_assert_num_queries):
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': str(tmp_path),
+            }
+        }
+        url = '/api/v1/categories/'
+        self.check_cached(client, url, django_assert_num_queries)
+        admin_client.post(url, data={'name': 'Книги', 'slug': 'books'})
+        data = self.check_cached(client, url, django_assert_num_queries)
+        assert data['count'] == 1, (
+            'Проверьте, что кеш работает с файловым бэкендом.'
+        )
+
+    def test_04_version_bumped_after_commit(self):
+        with transaction.atomic():
+            Genre.objects.create(name='Вестерн', slug='western')
+            in_transaction = get_versions(Genre)
+        assert get_versions(Genre) != in_transaction, (
+            'Проверьте, что версия модели сдвигается ещё раз после фиксации '
+            'транзакции: иначе под новой версией может закешироваться '
+            'ответ со старыми данными.'
+        )
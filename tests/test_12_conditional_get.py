@@ -0,0 +1,100 @@
+import time
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from django.utils.http import http_date
+
+from api.cache import get_versions
+from api.v1 import mixins
+from api.v1.views import TitleViewSet
+from reviews.models import Title
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ConditionalGet:
+
+    @pytest.fixture
+    def later(self, monkeypatch):
+        """Часы ответов на две секунды впереди последних изменений."""
+        monkeypatch.setattr(
+            mixins, 'time', SimpleNamespace(time=lambda: time.time() + 2)
+        )
+
+    def check_not_modified(self, client, url, django_assert_max_num_queries):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.get('ETag')
+        last_modified = response.get('Last-Modified')
+        assert etag and last_modified, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+        with django_assert_max_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с совпадающим '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с `If-Modified-Since` '
+            'не раньше `Last-Modified` возвращает ответ со статусом 304.'
+        )
+        return etag
+
+    def test_01_conditional_get(self, client, admin_client, admin,
+                                user_client, user, later,
+                                django_assert_max_num_queries):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        review_url = f'{reviews_url}{reviews[1]["id"]}/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        urls = (
+            '/api/v1/titles/', title_url, reviews_url, review_url,
+            comments_url, f'{comments_url}{comments[0]["id"]}/',
+        )
+        etags = {
+            url: self.check_not_modified(
+                client, url, django_assert_max_num_queries
+            )
+            for url in urls
+        }
+
+        user_client.patch(review_url, data={'score': 9})
+        for url in (title_url, reviews_url, review_url):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после изменения отзыва GET-запрос к `{url}` '
+                'со старым `If-None-Match` возвращает актуальные данные.'
+            )
+            assert response['ETag'] != etags[url]
+
+    def test_02_last_modified_same_second(self, client, monkeypatch):
+        title = Title.objects.create(name='Сталкер', year=1979)
+        url = f'/api/v1/titles/{title.pk}/'
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert 'Last-Modified' not in response, (
+            'Проверьте, что `Last-Modified` не отдаётся, пока не прошла '
+            'секунда последнего изменения.'
+        )
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `If-Modified-Since` не даёт 304 для изменений '
+            'текущей секунды.'
+        )
+
+        version = max(get_versions(*TitleViewSet.condition_models))
+        monkeypatch.setattr(
+            mixins, 'time',
+            SimpleNamespace(time=lambda: version / 10 ** 9 + 1),
+        )
+        assert client.get(url)['Last-Modified'] == http_date(
+            -(-version // 10 ** 9)
+        ), 'Проверьте, что `Last-Modified` округляется вверх до секунды.'
@@ -0,0 +1,212 @@
+import csv
+import hashlib
+import json
+import threading
+import time
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import models
+
+from reviews.management.commands.importdata import Command
+from reviews.models import (Category, Comment, Genre, ImportedRow, Review,
+                            Title)
+
+MODELS = (
+    get_user_model(), Category, Genre, Title, Title.genre.through, Review,
+    Comment,
+)
+
+
+def snapshot():
+    counts = {model._meta.label: model.objects.count() for model in MODELS}
+    ratings = Title.objects.order_by('pk').values_list(
+        'score_sum', 'review_count', 'rating'
+    )
+    return counts, list(ratings)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ImportData:
+
+    def test_01_bulk_matches_row_by_row(self):
+        call_command('importdata', stdout=StringIO())
+        expected = snapshot()
+        call_command('flush', interactive=False, verbosity=0)
+
+        out = StringIO()
+        call_command('importdata', bulk=True, chunk_size=7, stdout=out)
+        assert 'Записи успешно импортированы.' in out.getvalue()
+        assert snapshot() == expected, (
+            'Проверьте, что `importdata --bulk` загружает те же данные, '
+            'что и построчный импорт.'
+        )
+
+    def copy_data(self, path):
+        for csv_file in (settings.BASE_DIR / 'static/data').iterdir():
+            (path / csv_file.name).write_bytes(csv_file.read_bytes())
+
+    def write_users_with_passwords(self, path, passwords):
+        with open(path / 'users.csv', newline='') as csvfile:
+            users = list(csv.DictReader(csvfile))
+        with open(path / 'users.csv', 'w', newline='') as csvfile:
+            writer = csv.DictWriter(
+                csvfile, fieldnames=(*users[0].keys(), 'password')
+            )
+            writer.writeheader()
+            for user, password in zip(users, passwords):
+                writer.writerow({**user, 'password': password})
+        return users
+
+    def test_02_bulk_reports_broken_rows(self, tmp_path):
+        self.copy_data(tmp_path)
+        with open(tmp_path / 'titles.csv', 'a') as csvfile:
+            csvfile.write('\r\n999,Без категории,2000,999\r\n')
+
+        out = StringIO()
+        call_command('importdata', bulk=True, path=tmp_path, stdout=out)
+        assert 'При импорте возникли ошибки!' in out.getvalue()
+        assert not Title.objects.filter(pk=999).exists()
+        assert Title.objects.count() == 32, (
+            'Проверьте, что `importdata --bulk` пропускает строки со '
+            'ссылками на несуществующие объекты и загружает остальные.'
+        )
+
+    @pytest.mark.parametrize('mode', ('hash', 'prehashed', 'unusable'))
+    def test_03_bulk_user_passwords(self, tmp_path, mode):
+        self.copy_data(tmp_path)
+        passwords = [f'password{idx}' for idx in range(5)]
+        csv_passwords = passwords
+        if mode == 'prehashed':
+            csv_passwords = [make_password(password) for password in passwords]
+        users = self.write_users_with_passwords(tmp_path, csv_passwords)
+
+        out = StringIO()
+        call_command(
+            'importdata', bulk=True, path=tmp_path, passwords=mode,
+            hash_workers=2, stdout=out,
+        )
+        assert 'Записи успешно импортированы.' in out.getvalue()
+        for user, password in zip(users, passwords):
+            db_user = get_user_model().objects.get(pk=user['id'])
+            assert db_user.check_password(password) == (mode != 'unusable'), (
+                f'Проверьте, что `importdata --bulk --passwords {mode}` '
+                'корректно сохраняет пароли пользователей.'
+            )
+            assert db_user.password != password
+
+    def test_04_jobs_respect_dependencies(self):
+        events = []
+        lock = threading.Lock()
+
+        def task(csv_file):
+            with lock:
+                events.append(('start', csv_file))
+            time.sleep(0.01)
+            with lock:
+                events.append(('end', csv_file))
+            return 0
+
+        command = Command(stdout=StringIO())
+        csv_files = [csv_file for csv_file, _ in command.get_import_functions()]
+        command.run_tasks(
+            {csv_file: lambda f=csv_file: task(f) for csv_file in csv_files},
+            jobs=3,
+        )
+        for csv_file in csv_files:
+            started = events.index(('start', csv_file))
+            for dependency in Command.DEPENDENCIES.get(csv_file, ()):
+                assert events.index(('end', dependency)) < started, (
+                    f'Проверьте, что `{csv_file}` загружается только после '
+                    f'`{dependency}`.'
+                )
+        assert set(events[:3]) == {
+            ('start', 'users.csv'),
+            ('start', 'category.csv'),
+            ('start', 'genre.csv'),
+        }, (
+            'Проверьте, что независимые файлы загружаются одновременно.'
+        )
+
+    def test_05_jobs_on_sqlite(self):
+        out = StringIO()
+        call_command('importdata', bulk=True, jobs=3, stdout=out)
+        assert 'Записи успешно импортированы.' in out.getvalue()
+        assert 'review.csv: 72 записей' in out.getvalue(), (
+            'Проверьте, что для каждого файла выводится число записей и '
+            'скорость загрузки.'
+        )
+
+    def test_06_upsert(self, tmp_path):
+        call_command('importdata', bulk=True, stdout=StringIO())
+        self.copy_data(tmp_path)
+        with open(tmp_path / 'titles.csv', 'a') as csvfile:
+            csvfile.write('\r\n999,Новое произведение,2000,1\r\n')
+        genres = (tmp_path / 'genre.csv').read_text()
+        (tmp_path / 'genre.csv').write_text(
+            genres.replace('1,Драма,drama', '99,Новая драма,drama')
+        )
+        with open(tmp_path / 'genre_title.csv', 'a') as csvfile:
+            csvfile.write('\r\n999,999,99\r\n')
+        review = Review.objects.get(pk=1)
+        with open(tmp_path / 'review.csv', newline='') as csvfile:
+            reviews = list(csv.DictReader(csvfile))
+        reviews[0]['score'] = '1'
+        with open(tmp_path / 'review.csv', 'w', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=reviews[0].keys())
+            writer.writeheader()
+            writer.writerows(reviews)
+
+        out = StringIO()
+        call_command('importdata', upsert=True, path=tmp_path, stdout=out)
+        assert 'Записи успешно импортированы.' in out.getvalue(), (
+            'Проверьте, что `importdata --upsert` работает с непустой базой.'
+        )
+        drama = Genre.objects.get(slug='drama')
+        assert drama.name == 'Новая драма' and Genre.objects.count() == 15, (
+            'Проверьте, что `importdata --upsert` сопоставляет жанры по slug.'
+        )
+        title = Title.objects.get(pk=999)
+        assert list(title.genre.all()) == [drama]
+        review.title.refresh_from_db()
+        assert review.title.score_sum == (
+            Review.objects.filter(title=review.title).aggregate(
+                total=models.Sum('score')
+            )['total']
+        ), (
+            'Проверьте, что после `importdata --upsert` пересчитывается '
+            'рейтинг произведений с изменёнными отзывами.'
+        )
+        assert Review.objects.get(pk=1).score == 1
+
+        out = StringIO()
+        call_command('importdata', upsert=True, path=tmp_path, stdout=out)
+        assert 'review.csv: 0 записей' in out.getvalue(), (
+            'Проверьте, что повторный `importdata --upsert` пропускает '
+            'неизменённые строки.'
+        )
+
+    def test_07_upsert_digest_is_keyed(self, tmp_path, settings):
+        self.copy_data(tmp_path)
+        users = self.write_users_with_passwords(
+            tmp_path, [f'password{idx}' for idx in range(5)]
+        )
+        call_command('importdata', upsert=True, path=tmp_path,
+                     stdout=StringIO())
+        user = {**users[0], 'password': 'password0'}
+        digest = ImportedRow.objects.get(
+            model='users.user', key=user['id']
+        ).digest
+        plain = hashlib.sha1(
+            json.dumps(user, sort_keys=True, ensure_ascii=False).encode()
+        ).hexdigest()
+        assert digest != plain, (
+            'Проверьте, что хеш строки пользователя с паролем вычисляется '
+            'с секретным ключом.'
+        )
+        settings.SECRET_KEY = 'other-secret-key'
+        assert Command.get_digest(user) != digest
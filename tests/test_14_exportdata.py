@@ -0,0 +1,112 @@
+import gzip
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from reviews.management.commands.exportdata import Command
+from reviews.models import Category, Comment, Genre, Review, Title
+
+CSV_FILES = (
+    'users.csv', 'category.csv', 'genre.csv', 'titles.csv',
+    'genre_title.csv', 'review.csv', 'comments.csv',
+)
+
+
+def snapshot():
+    return [
+        list(model.objects.order_by('pk').values_list(*fields))
+        for model, fields in (
+            (get_user_model(), ('id', 'username', 'email', 'role')),
+            (Category, ('id', 'slug')),
+            (Genre, ('id', 'slug')),
+            (Title, ('id', 'name', 'category_id', 'description', 'rating')),
+            (Title.genre.through, ('title_id', 'genre_id')),
+            (Review, (
+                'id', 'title_id', 'author_id', 'score', 'text', 'pub_date'
+            )),
+            (Comment, ('id', 'review_id', 'author_id', 'text', 'pub_date')),
+        )
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ExportData:
+
+    def test_01_export_roundtrip(self, tmp_path):
+        call_command('importdata', bulk=True, stdout=StringIO())
+        Title.objects.filter(pk=1).update(description='Описание')
+        expected = snapshot()
+
+        out = StringIO()
+        call_command('exportdata', tmp_path, chunk_size=10, stdout=out)
+        assert 'Записи успешно экспортированы.' in out.getvalue()
+        for csv_file in CSV_FILES:
+            assert (tmp_path / csv_file).exists(), (
+                f'Проверьте, что `exportdata` создаёт файл `{csv_file}`.'
+            )
+
+        call_command('flush', interactive=False, verbosity=0)
+        call_command(
+            'importdata', bulk=True, path=tmp_path, stdout=StringIO()
+        )
+        assert snapshot() == expected, (
+            'Проверьте, что файлы `exportdata` загружаются через '
+            '`importdata` без потери данных.'
+        )
+
+    def test_02_export_gzip(self, tmp_path):
+        call_command('importdata', bulk=True, stdout=StringIO())
+        call_command('exportdata', tmp_path / 'plain', stdout=StringIO())
+        call_command(
+            'exportdata', tmp_path / 'gz', gzip=True, stdout=StringIO()
+        )
+        for csv_file in CSV_FILES:
+            with gzip.open(tmp_path / 'gz' / f'{csv_file}.gz', 'rb') as f:
+                compressed = f.read()
+            assert compressed == (tmp_path / 'plain' / csv_file).read_bytes(), (
+                'Проверьте, что `exportdata --gzip` пишет сжатые копии тех '
+                'же csv файлов.'
+            )
+
+        expected = snapshot()
+        call_command('flush', interactive=False, verbosity=0)
+        call_command(
+            'importdata', bulk=True, path=tmp_path / 'gz', stdout=StringIO()
+        )
+        assert snapshot() == expected, (
+            'Проверьте, что `importdata` загружает файлы `exportdata --gzip`.'
+        )
+
+    def test_03_export_in_one_transaction(self, tmp_path, monkeypatch):
+        call_command('importdata', bulk=True, stdout=StringIO())
+        export_data = Command.export_data
+        atomic = []
+
+        def export_in_transaction(self, *args):
+            atomic.append(connection.in_atomic_block)
+            return export_data(self, *args)
+
+        monkeypatch.setattr(Command, 'export_data', export_in_transaction)
+        call_command('exportdata', tmp_path, stdout=StringIO())
+        assert atomic == [True] * len(CSV_FILES), (
+            'Проверьте, что `exportdata` читает все таблицы в одной '
+            'транзакции.'
+        )
+
+    def test_04_pub_date_upsert(self, tmp_path):
+        call_command('importdata', bulk=True, stdout=StringIO())
+        call_command('exportdata', tmp_path, stdout=StringIO())
+        expected = snapshot()
+        Review.objects.update(pub_date=timezone.now())
+        Comment.objects.update(pub_date=timezone.now())
+        call_command(
+            'importdata', upsert=True, path=tmp_path, stdout=StringIO()
+        )
+        assert snapshot() == expected, (
+            'Проверьте, что `importdata --upsert` сохраняет даты '
+            'публикации из csv файлов.'
+        )
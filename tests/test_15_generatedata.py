@@ -0,0 +1,89 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, Max, Min
+
+from reviews.models import Comment, Review, Title
+
+OPTIONS = {
+    'users': 200, 'categories': 3, 'genres': 10, 'titles': 40,
+    'reviews': 400, 'comments': 100,
+}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15GenerateData:
+
+    def test_01_generate_csv_reproducible(self, tmp_path):
+        for name in ('first', 'second'):
+            call_command(
+                'generatedata', output=tmp_path / name, stdout=StringIO(),
+                **OPTIONS,
+            )
+        for csv_file in (tmp_path / 'first').iterdir():
+            assert csv_file.read_bytes() == (
+                tmp_path / 'second' / csv_file.name
+            ).read_bytes(), (
+                'Проверьте, что `generatedata` с одинаковым `--seed` '
+                'генерирует одинаковые данные.'
+            )
+
+        out = StringIO()
+        call_command(
+            'importdata', bulk=True, path=tmp_path / 'first', stdout=out
+        )
+        assert 'Записи успешно импортированы.' in out.getvalue(), (
+            'Проверьте, что csv файлы `generatedata` принимает `importdata`.'
+        )
+        assert Comment.objects.count() == OPTIONS['comments']
+        with open(tmp_path / 'first' / 'review.csv', newline='') as csvfile:
+            pub_dates = {
+                int(row['id']): row['pub_date']
+                for row in csv.DictReader(csvfile)
+            }
+        assert {
+            pk: pub_date.isoformat().replace('+00:00', 'Z')
+            for pk, pub_date in Review.objects.values_list('id', 'pub_date')
+        } == pub_dates, (
+            'Проверьте, что `importdata --bulk` сохраняет даты публикации '
+            'из csv файлов.'
+        )
+
+    def test_02_generate_db_skewed(self):
+        call_command('generatedata', stdout=StringIO(), **OPTIONS)
+        assert Title.objects.count() == OPTIONS['titles']
+        assert Review.objects.count() == OPTIONS['reviews']
+        counts = sorted(
+            Title.objects.annotate(total=Count('reviews')).values_list(
+                'total', flat=True
+            ),
+            reverse=True,
+        )
+        assert counts[0] > 5 * counts[len(counts) // 2], (
+            'Проверьте, что отзывы распределяются по произведениям '
+            'неравномерно (по закону Ципфа).'
+        )
+        assert list(
+            Title.objects.order_by('-review_count').values_list(
+                'review_count', flat=True
+            )
+        ) == counts, (
+            'Проверьте, что `generatedata` заполняет рейтинг произведений.'
+        )
+        for model in (Review, Comment):
+            dates = model.objects.aggregate(
+                first=Min('pub_date'), last=Max('pub_date')
+            )
+            assert (dates['last'] - dates['first']).days > 30, (
+                'Проверьте, что `generatedata` сохраняет в базе '
+                'сгенерированные даты публикации.'
+            )
+        title = Title.objects.create(name='Новое', year=2000)
+        review = Review.objects.create(
+            title=title, author_id=1, text='Отзыв', score=5
+        )
+        assert review.pub_date is not None, (
+            'Проверьте, что после генерации `auto_now_add` снова работает.'
+        )
@@ -0,0 +1,71 @@
+import re
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+
+from users.models import ConfirmationCode
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ConfirmationCode:
+    url_signup = '/api/v1/auth/signup/'
+    url_token = '/api/v1/auth/token/'
+    data = {'username': 'code_user', 'email': 'code_user@yamdb.fake'}
+
+    def signup(self, client):
+        response = client.post(self.url_signup, data=self.data)
+        assert response.status_code == HTTPStatus.OK
+        return re.search(r'YaMDb: (\S+)', mail.outbox[-1].body).group(1)
+
+    def get_token(self, client, code):
+        return client.post(self.url_token, data={
+            'username': self.data['username'], 'confirmation_code': code,
+        })
+
+    def test_01_code_is_single_use(self, client, django_user_model):
+        code = self.signup(client)
+        user = django_user_model.objects.get(username=self.data['username'])
+        assert ConfirmationCode.objects.get(user=user).digest != code, (
+            'Проверьте, что код подтверждения не хранится в открытом виде.'
+        )
+        assert not user.has_usable_password(), (
+            'Проверьте, что код подтверждения не записывается в пароль '
+            'пользователя.'
+        )
+        response = self.get_token(client, code)
+        assert response.status_code == HTTPStatus.OK
+        assert 'access' in response.json()
+        response = self.get_token(client, code)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения можно использовать только '
+            'один раз.'
+        )
+
+    def test_02_new_code_replaces_old(self, client):
+        old_code = self.signup(client)
+        new_code = self.signup(client)
+        assert self.get_token(client, old_code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что новый код подтверждения отменяет предыдущий.'
+        assert self.get_token(client, new_code).status_code == HTTPStatus.OK
+
+    def test_03_expired_code(self, client, settings):
+        code = self.signup(client)
+        settings.CONFIRMATION_CODE_TTL = timedelta(0)
+        assert self.get_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что просроченный код подтверждения не принимается.'
+
+    def test_04_password_untouched(self, client, user):
+        user.set_password('password')
+        user.save()
+        client.post(self.url_signup, data={
+            'username': user.username, 'email': user.email,
+        })
+        user.refresh_from_db()
+        assert user.check_password('password'), (
+            'Проверьте, что запрос кода подтверждения не меняет пароль '
+            'пользователя.'
+        )
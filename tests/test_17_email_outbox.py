@@ -0,0 +1,105 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.models import OutboxEmail
+
+
+class CountingBackend(EmailBackend):
+    connections = 0
+
+    def open(self):
+        CountingBackend.connections += 1
+        return super().open()
+
+
+class FailingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.fixture(autouse=True)
+    def use_outbox(self, settings):
+        settings.EMAIL_OUTBOX = True
+
+    def signup(self, client, count):
+        for number in range(count):
+            response = client.post(self.url_signup, data={
+                'username': f'outbox{number}',
+                'email': f'outbox{number}@yamdb.fake',
+            })
+            assert response.status_code == HTTPStatus.OK
+
+    def test_01_signup_enqueues_email(self, client):
+        self.signup(client, 1)
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что при включённом EMAIL_OUTBOX регистрация не '
+            'отправляет письмо сама.'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.recipient == 'outbox0@yamdb.fake'
+        assert 'YaMDb: ' in email.body
+
+    def test_02_send_in_batches(self, client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_17_email_outbox.CountingBackend'
+        CountingBackend.connections = 0
+        self.signup(client, 5)
+        call_command('sendoutbox', batch_size=2, stdout=StringIO())
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            f'outbox{number}@yamdb.fake' for number in range(5)
+        ], 'Проверьте, что sendoutbox отправляет все письма из очереди.'
+        assert CountingBackend.connections == 3, (
+            'Проверьте, что sendoutbox открывает одно соединение на пачку '
+            'писем.'
+        )
+        assert not OutboxEmail.objects.exists(), (
+            'Проверьте, что отправленные письма удаляются из очереди.'
+        )
+
+    def test_03_retry_with_backoff(self, client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_17_email_outbox.FailingBackend'
+        self.signup(client, 1)
+        call_command('sendoutbox', stdout=StringIO())
+        email = OutboxEmail.objects.get()
+        assert email.attempts == 1
+        assert email.last_error == 'SMTP недоступен'
+        first_delay = email.next_attempt - timezone.now()
+        assert first_delay > settings.EMAIL_OUTBOX_RETRY_DELAY * 0.9, (
+            'Проверьте, что неудачное письмо откладывается.'
+        )
+        call_command('sendoutbox', stdout=StringIO())
+        assert OutboxEmail.objects.get().attempts == 1, (
+            'Проверьте, что отложенное письмо не отправляется раньше срока.'
+        )
+
+        OutboxEmail.objects.update(next_attempt=timezone.now())
+        call_command('sendoutbox', stdout=StringIO())
+        email = OutboxEmail.objects.get()
+        assert email.attempts == 2
+        assert email.next_attempt - timezone.now() > first_delay, (
+            'Проверьте, что задержка растёт с каждой неудачной попыткой.'
+        )
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        OutboxEmail.objects.update(next_attempt=timezone.now())
+        call_command('sendoutbox', stdout=StringIO())
+        assert len(mail.outbox) == 1
+        assert not OutboxEmail.objects.exists()
+
+    def test_04_max_attempts(self, client, settings):
+        self.signup(client, 1)
+        OutboxEmail.objects.update(attempts=3)
+        call_command('sendoutbox', max_attempts=3, stdout=StringIO())
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что письма, исчерпавшие попытки, не отправляются.'
+        )
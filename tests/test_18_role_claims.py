@@ -0,0 +1,135 @@
+from http import HTTPStatus
+
+import pytest
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import (TOKEN_VERSION_KEY, get_access_token,
+                                load_token_version)
+from api.cache import get_cache
+from tests.utils import create_titles
+
+
+def get_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def count_user_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return sum(
+        'users_user' in query['sql'] for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18RoleClaims:
+
+    @pytest.fixture(autouse=True)
+    def use_role_claims(self, settings):
+        settings.JWT_ROLE_CLAIMS = True
+
+    def test_01_token_claims(self, client):
+        data = {'username': 'claims', 'email': 'claims@yamdb.fake'}
+        client.post('/api/v1/auth/signup/', data=data)
+        code = mail.outbox[-1].body.split('YaMDb: ')[1].split()[0]
+        response = client.post('/api/v1/auth/token/', data={
+            'username': data['username'], 'confirmation_code': code,
+        })
+        assert response.status_code == HTTPStatus.OK
+        token = AccessToken(response.json()['access'])
+        assert token['role'] == 'user' and token['username'] == 'claims', (
+            'Проверьте, что при JWT_ROLE_CLAIMS токен содержит роль и имя '
+            'пользователя.'
+        )
+
+    def test_02_permissions_without_user_query(self, admin):
+        url = '/api/v1/users/'
+        plain_queries = count_user_queries(
+            get_client(AccessToken.for_user(admin)), url
+        )
+        client = get_client(get_access_token(admin))
+        count_user_queries(client, url)
+        assert count_user_queries(client, url) == plain_queries - 1, (
+            'Проверьте, что токен с ролью не загружает пользователя из базы, '
+            'а версия токенов кешируется.'
+        )
+        response = client.get('/api/v1/users/me/')
+        assert response.json()['bio'] == admin.bio
+
+    def test_03_role_change_revokes_token(self, admin_client, user):
+        user_client = get_client(get_access_token(user))
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.OK
+        )
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что смена роли отзывает выданные токены с ролью.'
+        user.refresh_from_db()
+        new_client = get_client(get_access_token(user))
+        response = new_client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.OK
+
+    def test_04_delete_revokes_token(self, admin_client, user):
+        user_client = get_client(get_access_token(user))
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.OK
+        )
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что удаление пользователя отзывает его токены.'
+
+    def test_05_write_with_token_user(self, admin_client, user):
+        titles, _, _ = create_titles(admin_client)
+        user_client = get_client(get_access_token(user))
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = user_client.post(url, data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username
+        review_url = f'{url}{response.json()["id"]}/'
+        response = user_client.patch(review_url, data={'score': 6})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что автор с токеном с ролью может изменить свой '
+            'отзыв.'
+        )
+        response = user_client.post(url, data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_06_revoked_in_other_process(self, user):
+        user_client = get_client(get_access_token(user))
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.OK
+        )
+        get_user_model().objects.filter(pk=user.pk).update(
+            token_version=F('token_version') + 1
+        )
+        get_cache().set(
+            TOKEN_VERSION_KEY.format(user.pk), load_token_version(user.pk)
+        )
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что токен из кеша токенов отклоняется, если его '
+            'отозвали в другом процессе.'
+        )
+
+    def test_07_requires_shared_cache(self, settings):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        with pytest.raises(ImproperlyConfigured):
+            apps.get_app_config('api').ready()
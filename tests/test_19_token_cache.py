@@ -0,0 +1,143 @@
+from http import HTTPStatus
+
+import pytest
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError
+from django.db.models import F
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import (TOKEN_VERSION_KEY, load_token_version,
+                                token_cache)
+
+
+def get_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19TokenCache:
+    url_me = '/api/v1/users/me/'
+
+    @pytest.fixture(autouse=True)
+    def cache_location(self, token_cache_enabled):
+        return token_cache_enabled
+
+    def test_01_hits_skip_user_query(self, user_client,
+                                     django_assert_num_queries):
+        user_client.get(self.url_me)
+        assert token_cache.info()['misses'] == 1
+        with django_assert_num_queries(0):
+            response = user_client.get(self.url_me)
+        assert response.status_code == HTTPStatus.OK
+        assert token_cache.info()['hits'] == 1, (
+            'Проверьте, что повторный запрос с тем же токеном берёт '
+            'пользователя из кеша токенов.'
+        )
+
+    def test_02_invalidate_on_users_me(self, user_client):
+        user_client.get(self.url_me)
+        user_client.patch(self.url_me, data={'bio': 'new bio'})
+        assert token_cache.info()['size'] == 0
+        assert user_client.get(self.url_me).json()['bio'] == 'new bio'
+
+    def test_03_invalidate_on_role_change(self, admin_client, user,
+                                          user_client):
+        assert user_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert user_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.OK
+        ), 'Проверьте, что изменение пользователя сбрасывает кеш токенов.'
+
+    def test_04_role_changed_in_other_process(self, user, user_client,
+                                              cache_location):
+        assert user_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        get_user_model().objects.filter(pk=user.pk).update(
+            role='admin', token_version=F('token_version') + 1
+        )
+        other_process_cache = FileBasedCache(cache_location, {})
+        other_process_cache.set(
+            TOKEN_VERSION_KEY.format(user.pk), load_token_version(user.pk)
+        )
+        assert user_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.OK
+        ), (
+            'Проверьте, что кеш токенов сверяет версию токенов, которую '
+            'могли сдвинуть в другом процессе.'
+        )
+        get_user_model().objects.filter(pk=user.pk).delete()
+        other_process_cache.delete(TOKEN_VERSION_KEY.format(user.pk))
+        assert user_client.get(self.url_me).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что пользователь, удалённый в другом процессе, '
+            'теряет доступ.'
+        )
+
+    def test_05_invalidate_on_delete(self, admin_client, user, user_client):
+        user_client.get(self.url_me)
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert user_client.get(self.url_me).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что удаление пользователя сбрасывает кеш токенов.'
+
+    def test_06_bounded_and_ttl(self, user, settings):
+        settings.ACCESS_TOKEN_CACHE_SIZE = 2
+        clients = [get_client(user) for _ in range(3)]
+        for client in clients:
+            client.get(self.url_me)
+        assert token_cache.info()['size'] == 2, (
+            'Проверьте, что размер кеша токенов ограничен '
+            'ACCESS_TOKEN_CACHE_SIZE.'
+        )
+        clients[0].get(self.url_me)
+        assert token_cache.info()['hits'] == 0, (
+            'Проверьте, что из кеша вытесняется давно не использованный '
+            'токен.'
+        )
+
+        settings.ACCESS_TOKEN_CACHE_TIMEOUT = 0
+        token_cache.clear()
+        clients[0].get(self.url_me)
+        clients[0].get(self.url_me)
+        assert token_cache.info()['hits'] == 0, (
+            'Проверьте, что записи кеша токенов истекают через '
+            'ACCESS_TOKEN_CACHE_TIMEOUT.'
+        )
+
+    def test_07_failed_save_not_cached(self, user, user_client, monkeypatch):
+        bio = user_client.get(self.url_me).json()['bio']
+
+        def failed_save(*args, **kwargs):
+            raise DatabaseError('Ошибка записи.')
+
+        monkeypatch.setattr(get_user_model(), 'save', failed_save)
+        with pytest.raises(DatabaseError):
+            user_client.patch(self.url_me, data={'bio': 'unsaved'})
+        monkeypatch.undo()
+        assert user_client.get(self.url_me).json()['bio'] == bio, (
+            'Проверьте, что несохранённые изменения пользователя не '
+            'попадают в кеш токенов.'
+        )
+
+    def test_08_requires_shared_cache(self, settings):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        with pytest.raises(ImproperlyConfigured):
+            apps.get_app_config('api').ready()
+        settings.ACCESS_TOKEN_CACHE_SIZE = 0
+        apps.get_app_config('api').ready()
@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+
+from api.v1.serializers import ReviewSerializer
+from reviews.models import Review, Title
+from tests.utils import create_reviews
+
+User = get_user_model()
+
+@pytest.mark.django_db(transaction=True)
+class Test20ReviewQueries:
+
+    def test_01_list_queries(self, client, admin_client, admin,
+                             user_client, user, moderator_client, moderator,
+                             django_assert_num_queries):
+        author_map = {
+            admin: admin_client, user: user_client, moderator: moderator_client
+        }
+        _, titles = create_reviews(admin_client, author_map)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 3, (
+            'Проверьте, что список отзывов выбирается одним запросом с '
+            'авторами и одним запросом количества.'
+        )
+        with django_assert_num_queries(1):
+            response = client.get(f'{url}?pagination=cursor')
+        assert len(response.json()['results']) == 3
+
+        review_id = response.json()['results'][0]['id']
+        with django_assert_num_queries(1):
+            response = client.get(f'{url}{review_id}/')
+        assert response.status_code == HTTPStatus.OK
+        other_url = f'/api/v1/titles/{titles[1]["id"]}/reviews/{review_id}/'
+        assert client.get(other_url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что отзыв недоступен по пути другого произведения.'
+        )
+
+    def test_02_empty_list(self, client, admin_client, admin,
+                           django_assert_num_queries):
+        title = Title.objects.create(name='Без отзывов', year=2000)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 0
+        response = client.get('/api/v1/titles/999/reviews/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_create_queries(self, user_client, user, token_cache_enabled,
+                               django_assert_num_queries):
+        title = Title.objects.create(name='Произведение', year=2000)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        user_client.get('/api/v1/users/me/')
+        data = {'text': 'Отзыв', 'score': 7}
+        with django_assert_num_queries(3):
+            response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что отзыв создаётся в одной транзакции обновлением '
+            'рейтинга и одной вставкой без предварительных проверок.'
+        )
+        assert response.json()['author'] == user.username
+
+        response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {
+            'non_field_errors': ['Можно оставить только один отзыв!']
+        }
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum) == (1, 7), (
+            'Проверьте, что повторный отзыв не меняет рейтинг произведения.'
+        )
+        assert Review.objects.count() == 1
+
+    def test_04_other_integrity_errors(self, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        user_id = user.pk
+        user.delete()
+        with pytest.raises(IntegrityError):
+            ReviewSerializer().create({
+                'title_id': title.pk, 'author': User(pk=user_id),
+                'text': 'Отзыв', 'score': 7,
+            })
+        assert not Review.objects.exists(), (
+            'Проверьте, что ошибка внешнего ключа не выдаётся за повторный '
+            'отзыв.'
+        )
@@ -0,0 +1,82 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Comment
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21CommentQueries:
+
+    def test_01_list_queries(self, client, admin_client, admin,
+                             user_client, user, moderator_client, moderator,
+                             django_assert_num_queries):
+        author_map = {
+            admin: admin_client, user: user_client, moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 3, (
+            'Проверьте, что список комментариев выбирается одним запросом с '
+            'авторами и проверкой пути и одним запросом количества.'
+        )
+        with django_assert_num_queries(1):
+            response = client.get(f'{url}?pagination=cursor')
+        assert len(response.json()['results']) == 3
+
+        with django_assert_num_queries(1):
+            response = client.get(f'{url}{comments[0]["id"]}/')
+        assert response.status_code == HTTPStatus.OK
+
+        wrong_url = (
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+        assert client.get(wrong_url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии недоступны по пути другого '
+            'произведения.'
+        )
+        response = client.get(f'{wrong_url}{comments[0]["id"]}/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+        empty_url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/'
+            'comments/'
+        )
+        with django_assert_num_queries(2):
+            response = client.get(empty_url)
+        assert response.json()['count'] == 0
+
+    def test_02_create_queries(self, admin_client, admin, user_client, user,
+                               token_cache_enabled,
+                               django_assert_num_queries):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+        user_client.get('/api/v1/users/me/')
+        with django_assert_num_queries(3):
+            response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что комментарий создаётся в одной транзакции '
+            'проверкой отзыва и одной вставкой.'
+        )
+        assert response.json()['author'] == user.username
+
+        wrong_url = (
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+        response = user_client.post(wrong_url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert Comment.objects.count() == 2
@@ -0,0 +1,73 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review
+from tests.utils import create_comments
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Планы запросов SQLite'
+)
+
+
+def get_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return ' '.join(row[-1] for row in cursor.fetchall())
+
+
+def get_list_plans(client, url, table):
+    with CaptureQueriesContext(connection) as context:
+        client.get(url)
+    return [
+        get_plan(query['sql']) for query in context.captured_queries
+        if query['sql'].startswith(f'SELECT "{table}"')
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Indexes:
+
+    def check_plans(self, plans, index, url):
+        assert plans, f'Не найден запрос списка для `{url}`.'
+        for plan in plans:
+            assert index in plan, (
+                f'Проверьте, что список `{url}` выбирается по индексу '
+                f'`{index}`. План: {plan}'
+            )
+            assert 'TEMP B-TREE' not in plan, (
+                f'Проверьте, что список `{url}` не сортируется отдельно. '
+                f'План: {plan}'
+            )
+
+    def test_01_review_list(self, client, admin_client, admin):
+        _, _, titles = create_comments(admin_client, {admin: admin_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        for query in ('', '?pagination=cursor'):
+            plans = get_list_plans(client, url + query, 'reviews_review')
+            self.check_plans(plans, 'review_title_pub_date_idx', url + query)
+
+    def test_02_comment_list(self, client, admin_client, admin):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+        for query in ('', '?pagination=cursor'):
+            plans = get_list_plans(client, url + query, 'reviews_comment')
+            self.check_plans(
+                plans, 'comment_review_pub_date_idx', url + query
+            )
+
+    def test_03_author_reviews(self):
+        queryset = Review.objects.filter(author_id=1).order_by(
+            'title_id'
+        ).values_list('title_id', flat=True)
+        plan = get_plan(str(queryset.query))
+        assert 'COVERING INDEX review_author_title_idx' in plan, (
+            'Проверьте, что отзывы автора выбираются по индексу '
+            f'`review_author_title_idx`. План: {plan}'
+        )
+        assert 'TEMP B-TREE' not in plan
@@ -0,0 +1,87 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from reviews import search
+from reviews.models import Title
+
+
+def search_names(query):
+    return [title.name for title in search.search_titles(
+        Title.objects.all(), query
+    )]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23TitleSearch:
+
+    @pytest.fixture
+    def titles(self):
+        return [
+            Title.objects.create(
+                name='Солярис', year=1972, description='Мир океана.'
+            ),
+            Title.objects.create(
+                name='Мир Дикого Запада', year=2016, description='Сериал.'
+            ),
+            Title.objects.create(
+                name='Война и мир', year=1966, description=None
+            ),
+            Title.objects.create(
+                name='Сталкер', year=1979, description='Зона.'
+            ),
+        ]
+
+    def test_01_ranked_search(self, client, titles):
+        names = search_names('мир')
+        assert set(names) == {'Солярис', 'Мир Дикого Запада', 'Война и мир'}
+        assert names[-1] == 'Солярис', (
+            'Проверьте, что совпадение в названии ранжируется выше '
+            'совпадения в описании.'
+        )
+        assert search_names('мир запада') == ['Мир Дикого Запада'], (
+            'Проверьте, что поиск требует совпадения всех слов запроса.'
+        )
+        assert search_names('"мир') == search_names('мир')
+        assert search_names('   ') == [title.name for title in titles]
+
+        response = client.get('/api/v1/titles/?search=мир')
+        assert response.status_code == HTTPStatus.OK
+        assert [
+            title['name'] for title in response.json()['results']
+        ] == names, (
+            'Проверьте, что параметр `search` на `/api/v1/titles/` '
+            'возвращает произведения в порядке релевантности.'
+        )
+
+    def test_02_index_in_sync(self, titles):
+        titles[3].name = 'Пикник на обочине'
+        titles[3].save()
+        assert search_names('сталкер') == []
+        assert search_names('пикник') == ['Пикник на обочине']
+
+        Title.objects.filter(pk=titles[0].pk).update(description='Станция.')
+        assert 'Солярис' not in search_names('мир')
+
+        Title.objects.bulk_create([Title(name='Мирный атом', year=2000)])
+        assert 'Мирный атом' in search_names('мирный')
+
+        titles[1].delete()
+        assert search_names('запада') == []
+
+    @pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='Триггеры FTS5 SQLite'
+    )
+    def test_03_repair_lost_triggers(self, titles):
+        with connection.cursor() as cursor:
+            for name in search.SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER {name}')
+        Title.objects.create(name='Зеркало', year=1975)
+        search.repair(connection)
+        assert search_names('зеркало') == ['Зеркало'], (
+            'Проверьте, что после пересоздания таблицы триггеры поиска '
+            'восстанавливаются, а индекс перестраивается.'
+        )
+        Title.objects.create(name='Ностальгия', year=1983)
+        assert search_names('ностальгия') == ['Ностальгия']
@@ -0,0 +1,165 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.autocomplete import MAX_LIMIT, AutocompleteIndex, autocomplete_index
+from api.cache import bump_version
+from reviews.models import Category, Genre, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Autocomplete:
+    url = '/api/v1/autocomplete/'
+
+    @pytest.fixture
+    def catalog(self, admin, user, moderator):
+        category = Category.objects.create(name='Фильмы', slug='films')
+        Category.objects.create(name='Книги', slug='books')
+        genre = Genre.objects.create(name='Фантастика', slug='sci-fi')
+        Genre.objects.create(name='Фэнтези', slug='fantasy')
+        titles = [
+            Title.objects.create(name=name, year=2000, category=category)
+            for name in ('Фаворит', 'Фарго', 'Ёлки', 'Звёздные войны')
+        ]
+        titles[0].genre.set([genre])
+        for author, score in ((admin, 8), (user, 9)):
+            Review.objects.create(
+                title=titles[1], author=author, text='Отзыв', score=score
+            )
+        Review.objects.create(
+            title=titles[0], author=moderator, text='Отзыв', score=5
+        )
+        return titles
+
+    def get(self, client, query, **params):
+        response = client.get(self.url, data={'q': query, **params})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return response.json()
+
+    def test_01_prefix_search(self, client, catalog):
+        result = self.get(client, 'фа')
+        assert [title['name'] for title in result['titles']] == [
+            'Фарго', 'Фаворит'
+        ], (
+            'Проверьте, что произведения ранжируются по числу отзывов.'
+        )
+        assert result['genres'] == [{'name': 'Фантастика', 'slug': 'sci-fi'}]
+        assert result['categories'] == []
+        assert self.get(client, 'кн')['categories'] == [
+            {'name': 'Книги', 'slug': 'books'}
+        ]
+        assert self.get(client, 'фа', limit=1)['titles'] == [
+            {'id': catalog[1].pk, 'name': 'Фарго'}
+        ]
+        assert [
+            title['name'] for title in self.get(client, 'елк')['titles']
+        ] == ['Ёлки'], 'Проверьте, что буквы `ё` и `е` не различаются.'
+        assert [
+            title['name'] for title in self.get(client, 'войн')['titles']
+        ] == ['Звёздные войны'], (
+            'Проверьте, что префикс ищется с начала каждого слова.'
+        )
+        response = client.get(self.url, data={'q': 'фа', 'limit': 0})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        for query in ('!!', 'ф', ' ф! '):
+            response = client.get(self.url, data={'q': query})
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что пустой и однобуквенный префиксы отклоняются.'
+            )
+
+    def test_02_incremental_updates(self, client, user, catalog,
+                                    django_assert_num_queries):
+        self.get(client, 'фа')
+        with django_assert_num_queries(0):
+            self.get(client, 'фа')
+        catalog[0].name = 'Мистер Фокс'
+        catalog[0].save()
+        Genre.objects.create(name='Фарс', slug='farce')
+        Review.objects.create(
+            title=catalog[2], author=user, text='Отзыв', score=10
+        )
+        with django_assert_num_queries(0):
+            result = self.get(client, 'фо')
+        assert [title['name'] for title in result['titles']] == [
+            'Мистер Фокс'
+        ], (
+            'Проверьте, что изменения произведений применяются к индексу '
+            'без его перестройки.'
+        )
+        assert {
+            genre['slug'] for genre in self.get(client, 'фа')['genres']
+        } == {'sci-fi', 'farce'}
+        assert self.get(client, 'ел')['titles'][0]['id'] == catalog[2].pk
+        catalog[1].delete()
+        assert self.get(client, 'фарго')['titles'] == []
+
+    def test_03_api_writes_without_rebuild(self, client, admin_client,
+                                           catalog,
+                                           django_assert_num_queries):
+        self.get(client, 'фа')
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Фантомас', 'year': 1964, 'category': 'films',
+            'genre': ['sci-fi', 'fantasy'],
+        }, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        with django_assert_num_queries(0):
+            result = self.get(client, 'фан')
+        assert [title['name'] for title in result['titles']] == [
+            'Фантомас'
+        ], (
+            'Проверьте, что произведение, созданное через API вместе с '
+            'жанрами, не вызывает перестройку индекса.'
+        )
+
+    def test_04_rebuild_on_foreign_changes(self, client, catalog):
+        self.get(client, 'фа')
+        Title.objects.bulk_create([Title(name='Фауст', year=1994)])
+        bump_version(Title)
+        names = [title['name'] for title in self.get(client, 'фа')['titles']]
+        assert 'Фауст' in names, (
+            'Проверьте, что индекс перестраивается, если каталог изменён '
+            'в другом процессе.'
+        )
+
+    def test_05_foreign_change_before_local_write(self, client, catalog):
+        self.get(client, 'фа')
+        Genre.objects.bulk_create([Genre(name='Жуть', slug='horror')])
+        bump_version(Genre)
+        Title.objects.create(name='Жук', year=2010)
+        assert self.get(client, 'жу')['genres'] == [
+            {'name': 'Жуть', 'slug': 'horror'}
+        ], (
+            'Проверьте, что локальное изменение не принимает версии, '
+            'сдвинутые другими процессами.'
+        )
+
+    def test_06_short_prefix_top(self, client, user, catalog):
+        Title.objects.bulk_create(
+            Title(name=f'Фильм {index}', year=2000)
+            for index in range(MAX_LIMIT + 10)
+        )
+        bump_version(Title)
+        self.get(client, 'фи')
+        assert 'фи' in autocomplete_index.top
+        titles = Title.objects.filter(name__startswith='Фильм')
+        titles.get(name='Фильм 0').delete()
+        title = titles.get(name='Фильм 1')
+        title.name = 'Сериал'
+        title.save()
+        Review.objects.create(
+            title=titles.get(name='Фильм 9'), author=user, text='Отзыв',
+            score=10,
+        )
+        for query in ('фи', 'фил', 'фильм 1'):
+            assert autocomplete_index.search(query, MAX_LIMIT) == (
+                AutocompleteIndex().search(query, MAX_LIMIT)
+            ), (
+                'Проверьте, что лучшие элементы коротких префиксов '
+                'совпадают с результатом полной перестройки индекса.'
+            )
+        assert self.get(client, 'фи', limit=1)['titles'][0]['name'] == (
+            'Фильм 9'
+        )
@@ -0,0 +1,95 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Facets:
+    url = '/api/v1/titles/'
+
+    @pytest.fixture
+    def catalog(self):
+        films = Category.objects.create(name='Фильмы', slug='films')
+        books = Category.objects.create(name='Книги', slug='books')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        titles = [
+            Title.objects.create(name=name, year=year, category=category)
+            for name, year, category in (
+                ('Сталкер', 1979, films),
+                ('Солярис', 1972, films),
+                ('Зеркало', 1975, films),
+                ('Москва слезам не верит', 1980, films),
+                ('Мастер и Маргарита', 1967, books),
+                ('Без категории', 2001, None),
+            )
+        ]
+        for title in titles[:3]:
+            title.genre.set([drama])
+        titles[3].genre.set([drama, comedy])
+        titles[4].genre.set([comedy])
+        return titles
+
+    def get_facets(self, client, query):
+        response = client.get(f'{self.url}?{query}')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}?{query}` возвращает '
+            'ответ со статусом 200.'
+        )
+        return response.json()['facets']
+
+    def test_01_counts(self, client, catalog):
+        facets = self.get_facets(client, 'facets=')
+        assert facets['genre'] == [
+            {'slug': 'drama', 'name': 'Драма', 'count': 4},
+            {'slug': 'comedy', 'name': 'Комедия', 'count': 2},
+        ]
+        assert facets['category'] == [
+            {'slug': 'films', 'name': 'Фильмы', 'count': 4},
+            {'slug': 'books', 'name': 'Книги', 'count': 1},
+        ]
+        assert facets['decade'] == [
+            {'decade': 1960, 'count': 1},
+            {'decade': 1970, 'count': 3},
+            {'decade': 1980, 'count': 1},
+            {'decade': 2000, 'count': 1},
+        ]
+        facets = self.get_facets(client, 'genre=comedy&facets=category')
+        assert facets == {'category': [
+            {'slug': 'books', 'name': 'Книги', 'count': 1},
+            {'slug': 'films', 'name': 'Фильмы', 'count': 1},
+        ]}, (
+            'Проверьте, что фасеты считаются по выборке текущих фильтров.'
+        )
+        response = client.get(f'{self.url}?facets=genre,author')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'facets' not in client.get(self.url).json()
+
+    def test_02_queries_and_cache(self, client, catalog,
+                                  django_assert_num_queries):
+        """По запросу на фасет, повторно — из кэша без запросов."""
+        client.get(f'{self.url}?category=films&facets=genre')
+        with CaptureQueriesContext(connection) as cursor_list:
+            client.get(f'{self.url}?category=films&pagination=cursor')
+        with CaptureQueriesContext(connection) as page_list:
+            client.get(f'{self.url}?category=films')
+        with django_assert_num_queries(len(cursor_list) + 3):
+            self.get_facets(
+                client, 'category=films&facets=&pagination=cursor'
+            )
+        with django_assert_num_queries(len(page_list)):
+            facets = self.get_facets(client, 'facets=&category=films')
+        assert facets['category'] == [
+            {'slug': 'films', 'name': 'Фильмы', 'count': 4}
+        ]
+        Title.objects.create(
+            name='Ностальгия', year=1983, category=catalog[0].category
+        )
+        facets = self.get_facets(client, 'facets=category&category=films')
+        assert facets['category'][0]['count'] == 5, (
+            'Проверьте, что кэш фасетов сбрасывается при изменении каталога.'
+        )
@@ -0,0 +1,125 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from api.v1.filters import TitleFilter
+from reviews.models import Category, Genre, Review, Title
+
+
+def get_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return ' '.join(row[-1] for row in cursor.fetchall())
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26TitleFilters:
+    url = '/api/v1/titles/'
+
+    @pytest.fixture
+    def catalog(self, admin, user, moderator):
+        films = Category.objects.create(name='Фильмы', slug='films')
+        series = Category.objects.create(name='Сериалы', slug='series')
+        books = Category.objects.create(name='Книги', slug='books')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        titles = {
+            name: Title.objects.create(name=name, year=year, category=category)
+            for name, year, category in (
+                ('Сталкер', 1979, films),
+                ('Солярис', 1972, films),
+                ('Друзья', 1994, series),
+                ('Мастер и Маргарита', 1967, books),
+            )
+        }
+        titles['Сталкер'].genre.set([drama])
+        titles['Друзья'].genre.set([drama, comedy])
+        titles['Мастер и Маргарита'].genre.set([comedy])
+        for name, scores in (('Сталкер', (10, 9)), ('Друзья', (6,)),
+                             ('Мастер и Маргарита', (8, 7, 9))):
+            for author, score in zip((admin, user, moderator), scores):
+                Review.objects.create(
+                    title=titles[name], author=author, text='Отзыв',
+                    score=score,
+                )
+        return titles
+
+    def get_names(self, client, query):
+        response = client.get(f'{self.url}?{query}')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}?{query}` возвращает '
+            'ответ со статусом 200.'
+        )
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_filters(self, client, catalog):
+        assert self.get_names(client, 'genre=drama,comedy') == [
+            'Сталкер', 'Друзья', 'Мастер и Маргарита'
+        ], 'Проверьте, что `genre` принимает несколько слагов через запятую.'
+        assert self.get_names(
+            client, 'genre=drama,comedy&genre_match=all'
+        ) == ['Друзья'], (
+            'Проверьте, что при `genre_match=all` остаются произведения со '
+            'всеми жанрами списка.'
+        )
+        assert self.get_names(client, 'genre=drama') == ['Сталкер', 'Друзья']
+        assert self.get_names(client, 'category=films,series') == [
+            'Сталкер', 'Солярис', 'Друзья'
+        ]
+        assert self.get_names(client, 'year_min=1970&year_max=1980') == [
+            'Сталкер', 'Солярис'
+        ]
+        assert self.get_names(client, 'rating_min=7&rating_max=9') == [
+            'Мастер и Маргарита'
+        ]
+        response = client.get(f'{self.url}?genre_match=some')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_ordering(self, client, catalog):
+        assert self.get_names(client, 'ordering=-rating') == [
+            'Сталкер', 'Мастер и Маргарита', 'Друзья', 'Солярис'
+        ], 'Проверьте, что произведения без рейтинга идут в конце.'
+        assert self.get_names(client, 'ordering=rating') == [
+            'Друзья', 'Мастер и Маргарита', 'Сталкер', 'Солярис'
+        ]
+        assert self.get_names(client, 'ordering=year') == [
+            'Мастер и Маргарита', 'Солярис', 'Сталкер', 'Друзья'
+        ]
+        assert self.get_names(
+            client, 'ordering=-review_count&category=films,books'
+        ) == ['Мастер и Маргарита', 'Сталкер', 'Солярис']
+        response = client.get(f'{self.url}?ordering=description')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    @pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='Планы запросов SQLite'
+    )
+    @pytest.mark.parametrize('params, index', (
+        ({'genre': 'drama,comedy'}, 'title_genre_genre_title_idx'),
+        (
+            {'genre': 'drama,comedy', 'genre_match': 'all'},
+            'title_genre_genre_title_idx',
+        ),
+        (
+            {'category': 'films', 'year_min': 1970},
+            'reviews_title_category_id',
+        ),
+        ({'year_min': 1970, 'ordering': '-year'}, 'reviews_title_year'),
+        ({'ordering': '-rating'}, 'title_rating_idx'),
+        ({'ordering': '-review_count'}, 'title_review_count_idx'),
+    ))
+    def test_03_indexes(self, catalog, params, index):
+        filterset = TitleFilter(params, queryset=Title.objects.order_by('pk'))
+        plan = get_plan(filterset.qs[:10])
+        assert index in plan, (
+            f'Проверьте, что фильтр {params} использует индекс `{index}`. '
+            f'План: {plan}'
+        )
+        assert not re.search(r'SCAN reviews_title(?! USING)', plan), (
+            f'Проверьте, что фильтр {params} не просматривает всю таблицу '
+            f'произведений. План: {plan}'
+        )
+        assert 'TEMP B-TREE FOR ORDER BY' not in plan
@@ -0,0 +1,81 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import bump_version
+from api.references import genre_map
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27ReferenceMap:
+    url = '/api/v1/titles/'
+
+    @pytest.fixture
+    def genres(self):
+        Category.objects.create(name='Фильмы', slug='films')
+        return [
+            Genre.objects.create(name=f'Жанр {index}', slug=f'genre-{index}')
+            for index in range(5)
+        ]
+
+    def create_title(self, admin_client, genre):
+        data = {
+            'name': 'Сталкер', 'year': 1979, 'category': 'films',
+            'genre': genre,
+        }
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.url, data=data, format='json')
+        return response, [query['sql'] for query in context.captured_queries]
+
+    def test_01_create_without_slug_queries(self, admin_client, genres):
+        self.create_title(admin_client, ['genre-0'])
+        response, one_genre = self.create_title(admin_client, ['genre-0'])
+        assert response.status_code == HTTPStatus.CREATED
+        response, all_genres = self.create_title(
+            admin_client, [genre.slug for genre in genres]
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert [genre['slug'] for genre in response.json()['genre']] == [
+            genre.slug for genre in genres
+        ]
+        assert len(all_genres) == len(one_genre), (
+            'Проверьте, что число запросов при создании произведения не '
+            'зависит от числа жанров.'
+        )
+        assert not [sql for sql in all_genres if '"slug" =' in sql], (
+            'Проверьте, что слаги жанров и категории разрешаются без '
+            'запросов к базе.'
+        )
+        response, _ = self.create_title(admin_client, ['genre-0', 'unknown'])
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'genre' in response.json()
+
+    def test_02_filters_by_id(self, client, genres):
+        title = Title.objects.create(name='Сталкер', year=1979)
+        title.genre.set(genres[:2])
+        client.get(f'{self.url}?genre=genre-1')
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{self.url}?genre=genre-1,genre-4')
+        assert [item['id'] for item in response.json()['results']] == [
+            title.pk
+        ]
+        assert not [
+            query for query in context.captured_queries
+            if '"reviews_genre"."slug" IN' in query['sql']
+            or 'U1."slug" IN' in query['sql']
+        ], 'Проверьте, что фильтр по жанрам сравнивает идентификаторы.'
+
+    def test_03_invalidation(self, genres):
+        assert genre_map.get_ids(['genre-1']) == [genres[1].pk]
+        Genre.objects.filter(pk=genres[1].pk).update(slug='drama')
+        assert genre_map.get_ids(['drama']) == []
+        bump_version(Genre)
+        assert genre_map.get_ids(['drama']) == [genres[1].pk], (
+            'Проверьте, что справочник перечитывается после сдвига версии '
+            'в общем кеше.'
+        )
+        genres[2].delete()
+        assert genre_map.get_ids(['genre-2']) == []